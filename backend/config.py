@@ -28,9 +28,14 @@ GOOGLE_API_KEY = _optional("GOOGLE_API_KEY") or _optional("GEMINI_API_KEY")
 # --- LLM ---
 LLM_PROVIDER = _optional("LLM_PROVIDER", "gemini")
 GEMINI_MODEL = _optional("GEMINI_MODEL", "gemini-2.5-flash")
+# Upper bound on Gemini calls in flight from the async endpoints; size it to your quota.
+GEMINI_CONCURRENCY = int(_optional("GEMINI_CONCURRENCY", "16"))
 
 # --- SerpAPI ---
 SERPAPI_API_KEY = _optional("SERPAPI_API_KEY") or _optional("SERP_API_KEY")
+# Repeat searches for the same (query, location) are served from memory for this long.
+SERP_CACHE_TTL_SEC = int(_optional("SERP_CACHE_TTL_SEC", "3600"))
+SERP_CACHE_SIZE = int(_optional("SERP_CACHE_SIZE", "512"))
 
 # --- Supabase ---
 SUPABASE_URL = _require("VITE_SUPABASE_URL")
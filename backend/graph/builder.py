@@ -44,11 +44,16 @@ def _cache_key(topic: str) -> str:
     return hashlib.md5(normalized.encode()).hexdigest()[:16]
 
 
+_ID_STRIP = re.compile(r"[^\w\s-]")
+_WS = re.compile(r"\s+")
+_JSON_FENCE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+
+
 def _sanitize_id(text: str) -> str:
     """Convert text to a valid node ID."""
     # Remove special characters, replace spaces with underscores
-    sanitized = re.sub(r"[^\w\s-]", "", text.lower())
-    sanitized = re.sub(r"\s+", "_", sanitized.strip())
+    sanitized = _ID_STRIP.sub("", text.lower())
+    sanitized = _WS.sub("_", sanitized.strip())
     return sanitized[:50] or "node"
 
 
@@ -80,7 +85,7 @@ def _expand_subtopics_with_gemini(topic: str, max_subtopics: int = 5) -> list[st
         # Parse JSON response
         # Handle markdown code blocks
         if "```" in response:
-            match = re.search(r"```(?:json)?\s*([\s\S]*?)```", response)
+            match = _JSON_FENCE.search(response)
             if match:
                 response = match.group(1).strip()
         
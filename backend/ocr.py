@@ -8,6 +8,11 @@ Platform support:
 Privacy toggle:
   - Set OCR_ENABLED=false in .env to disable screen capture entirely
   - Users can paste text manually via the /detect/topic endpoint instead
+
+Run modes:
+  - ``python ocr.py``: capture until SIGTERM
+  - ``python ocr.py --worker``: persistent worker driven by the server; reads
+    START / STOP / EXIT lines on stdin so a new session costs no interpreter startup
 """
 
 import os
@@ -17,25 +22,31 @@ import platform
 from pathlib import Path
 from collections import defaultdict
 import json
+import signal
 import threading
 
-STOP_FILE = Path("stop.flag")
+OUTPUT_FILE = Path("output.jsonl")
 PLATFORM = platform.system()  # "Windows", "Darwin", "Linux"
 OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() not in ("false", "0", "no")
 
 sys.stdout.reconfigure(encoding="utf-8")
 
 
-def should_stop():
-    return STOP_FILE.exists()
+# Ends a standalone capture session on SIGTERM; worker mode gives each session its own event.
+_stop_requested = threading.Event()
+
 
+def _request_stop(signum, frame):
+    _stop_requested.set()
 
-def write_output(entries):
+
+def append_output(entry):
+    """Append one entry as a JSON line; the server tails this file incrementally."""
     try:
-        with open("output.json", "w", encoding="utf-8") as f:
-            json.dump(entries, f, indent=4, ensure_ascii=False)
+        with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
     except Exception as e:
-        print("[WARN] Could not write output.json:", e)
+        print(f"[WARN] Could not write {OUTPUT_FILE}:", e)
 
 
 # ── Tesseract auto-detection ──────────────────────────────────────────────
@@ -185,7 +196,9 @@ def ocr_image(img):
     return pytesseract.image_to_string(gray, config=config)
 
 
-def draw_border():
+def draw_border(stop=None):
+    """Show the capture indicator until the session's ``stop`` event is set."""
+    stop = stop or _stop_requested
     if PLATFORM != "Windows":
         return
 
@@ -208,9 +221,18 @@ def draw_border():
                 canvas.delete("all")
                 canvas.create_rectangle(0, 0, screen_width, 6, fill="red", outline="red", width=5)
 
+            # The worker outlives a capture session, so take the indicator down on stop.
+            # Each session has its own event, so a quick STOP/START cannot leave this open.
+            def close_on_stop():
+                if stop.is_set():
+                    root.destroy()
+                else:
+                    root.after(200, close_on_stop)
+
             root.bind("<Configure>", redraw)
             redraw()
             root.bind("<Escape>", lambda e: root.destroy())
+            close_on_stop()
             root.mainloop()
         except Exception as e:
             print(f"[WARN] Could not draw border (GUI unavailable): {e}")
@@ -278,7 +300,7 @@ def detect_text_classification(text):
     return True
 
 
-def finalize_window_capture(entries, window_title, captured_text, started_at, ended_at):
+def finalize_window_capture(window_title, captured_text, started_at, ended_at):
     captured_text = (captured_text or "").strip()
     if not captured_text:
         return
@@ -299,18 +321,14 @@ def finalize_window_capture(entries, window_title, captured_text, started_at, en
         "ocr_text": captured_text,
         "server": summary,
     }
-    entries.append(entry)
-    write_output(entries)
+    append_output(entry)
 
 
-# ── MAIN ──────────────────────────────────────────────────────────────────
-
-if __name__ == "__main__":
-    if not OCR_ENABLED:
-        print("[OCR] Screen capture is disabled (OCR_ENABLED=false).")
-        print("[OCR] Users can paste text manually via the /detect/topic endpoint.")
-        sys.exit(0)
+# ── CAPTURE SESSION ───────────────────────────────────────────────────────
 
+def capture_loop(stop=None):
+    """Capture the active window until ``stop`` is set, then flush what is buffered."""
+    stop = stop or _stop_requested
     border_drawn = False
 
     try:
@@ -320,16 +338,14 @@ if __name__ == "__main__":
         prev_title = None
         prev_time = time.time()
 
-        entries = []
         buffer_title = None
         buffer_started_at = None
         buffer_text = ""
 
-        while not should_stop():
-            for _ in range(20):
-                if should_stop():
-                    break
-                time.sleep(0.1)
+        while not stop.is_set():
+            # Sleep between frames, but wake the moment a stop is requested.
+            if stop.wait(2.0):
+                break
 
             title = get_active_window_title()
             current_time = time.time()
@@ -341,7 +357,6 @@ if __name__ == "__main__":
             if prev_title is not None and title != prev_title:
                 if should_capture(prev_title):
                     finalize_window_capture(
-                        entries,
                         window_title=buffer_title or prev_title,
                         captured_text=buffer_text,
                         started_at=buffer_started_at,
@@ -360,7 +375,7 @@ if __name__ == "__main__":
 
             if should_capture(title):
                 if not border_drawn:
-                    draw_border()
+                    draw_border(stop)
                     border_drawn = True
                 print("[OCR] Triggered for:", title)
 
@@ -378,7 +393,6 @@ if __name__ == "__main__":
         end_time = time.time()
         if buffer_title and should_capture(buffer_title):
             finalize_window_capture(
-                entries,
                 window_title=buffer_title,
                 captured_text=buffer_text,
                 started_at=buffer_started_at,
@@ -386,10 +400,72 @@ if __name__ == "__main__":
             )
 
         for window, seconds in time_spent.items():
-            entries.append({"window_title": window, "time_spent_sec": seconds})
-
-        write_output(entries)
+            append_output({"window_title": window, "time_spent_sec": seconds})
 
     except Exception as e:
         print("[ERROR] Unexpected error:", e)
         raise
+
+
+def _abort_worker(code=1):
+    """Exit the worker immediately; the server sees the exit code via poll()."""
+    sys.stdout.flush()
+    os._exit(code)
+
+
+def _run_session(stop):
+    try:
+        capture_loop(stop)
+    except Exception:
+        # A dead session must not leave the server thinking capture is still on,
+        # so take the whole worker down; the next START spawns a fresh one.
+        print("[OCR] Capture session failed; exiting worker.")
+        _abort_worker(1)
+
+
+def serve_commands(stream=None):
+    """Worker mode: run one capture session per START ... STOP, until EXIT or EOF."""
+    stream = stream or sys.stdin
+    session = None
+    session_stop = None
+
+    def stop_session():
+        nonlocal session
+        if session_stop is not None:
+            session_stop.set()
+        if session is not None:
+            session.join()
+            session = None
+
+    for line in stream:
+        command = line.strip().upper()
+        if command == "START":
+            if session is None or not session.is_alive():
+                session_stop = threading.Event()
+                session = threading.Thread(
+                    target=_run_session, args=(session_stop,), name="ocr-capture", daemon=True
+                )
+                session.start()
+        elif command == "STOP":
+            stop_session()
+            print("[OCR] Capture stopped.")
+        elif command == "EXIT":
+            break
+    # EOF means the server went away; still flush the open window.
+    stop_session()
+
+
+# ── MAIN ──────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    if not OCR_ENABLED:
+        print("[OCR] Screen capture is disabled (OCR_ENABLED=false).")
+        print("[OCR] Users can paste text manually via the /detect/topic endpoint.")
+        sys.exit(0)
+
+    if "--worker" in sys.argv[1:]:
+        serve_commands()
+    else:
+        # Treat SIGTERM as a graceful stop so the current window's capture is still flushed.
+        signal.signal(signal.SIGTERM, _request_stop)
+        capture_loop()
@@ -19,10 +19,19 @@ def _backend_dir() -> Path:
 	return Path(__file__).resolve().parent
 
 
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+_SLUG_DASH = re.compile(r"-+")
+_WS = re.compile(r"\s+")
+_FENCE_OPEN = re.compile(r"^```[a-zA-Z]*\n")
+_FENCE_CLOSE = re.compile(r"\n```$")
+_JSON_OBJECT_AT_END = re.compile(r"\{[\s\S]*\}\s*$")
+_JSON_OBJECT = re.compile(r"\{[\s\S]*\}")
+
+
 def _slugify(value: str) -> str:
 	value = (value or "").strip().lower()
-	value = re.sub(r"[^a-z0-9]+", "-", value)
-	value = re.sub(r"-+", "-", value).strip("-")
+	value = _SLUG_NONALNUM.sub("-", value)
+	value = _SLUG_DASH.sub("-", value).strip("-")
 	return value or "item"
 
 
@@ -36,12 +45,12 @@ def _extract_json_object(text: str) -> str | None:
 		return None
 	s = text.strip()
 	if s.startswith("```"):
-		s = re.sub(r"^```[a-zA-Z]*\n", "", s)
-		s = re.sub(r"\n```$", "", s).strip()
-	m = re.search(r"\{[\s\S]*\}\s*$", s)
+		s = _FENCE_OPEN.sub("", s)
+		s = _FENCE_CLOSE.sub("", s).strip()
+	m = _JSON_OBJECT_AT_END.search(s)
 	if m:
 		return m.group(0)
-	m = re.search(r"\{[\s\S]*\}", s)
+	m = _JSON_OBJECT.search(s)
 	if m:
 		return m.group(0)
 	return None
@@ -54,7 +63,7 @@ def _clean_choices(choices: Any) -> list[str]:
 	for c in choices:
 		if not isinstance(c, str):
 			continue
-		t = re.sub(r"\s+", " ", c).strip()
+		t = _WS.sub(" ", c).strip()
 		if t:
 			out.append(t)
 	return out
@@ -81,7 +90,7 @@ def _normalize_questions(raw_questions: Any, n: int) -> list[dict[str, Any]]:
 		question = q.get("question") or q.get("prompt") or ""
 		if not isinstance(question, str):
 			continue
-		question = re.sub(r"\s+", " ", question).strip()
+		question = _WS.sub(" ", question).strip()
 		if not question:
 			continue
 
@@ -106,7 +115,7 @@ def _normalize_questions(raw_questions: Any, n: int) -> list[dict[str, Any]]:
 				answer_index = 0
 			correct_answer = options[answer_index]
 		else:
-			correct_answer = re.sub(r"\s+", " ", correct_answer).strip()
+			correct_answer = _WS.sub(" ", correct_answer).strip()
 
 		is_correct_val = q.get("isCorrect")
 		is_correct: bool | None
@@ -1,17 +1,25 @@
 from pathlib import Path
+import asyncio
+import atexit
 import re
 import hashlib
+import heapq
 import json
 import logging
 import random
 import string
 import threading
+import time
 import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, date as date_type, timedelta
+from functools import lru_cache
+from operator import attrgetter
 from math import exp
 from fastapi import FastAPI, HTTPException, Query, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import subprocess
 import sys
 from pydantic import BaseModel
@@ -24,11 +32,11 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 from graph.builder import build_concept_graph, graph_to_legacy_format
 from config import (
-    GOOGLE_API_KEY, SERPAPI_API_KEY, CORS_ORIGINS, RATE_LIMIT_AI, RATE_LIMIT_DATA,
-    REQUEST_ID_CTX, setup_logging, validate_config,
+    GOOGLE_API_KEY, GEMINI_CONCURRENCY, SERPAPI_API_KEY, SERP_CACHE_TTL_SEC, SERP_CACHE_SIZE,
+    CORS_ORIGINS, RATE_LIMIT_AI, RATE_LIMIT_DATA, REQUEST_ID_CTX, setup_logging, validate_config,
 )
 from auth import get_current_user_id, get_optional_user_id
 from db import get_admin_client, health_check as db_health_check
@@ -40,6 +48,46 @@ from bkt import (
 )
 from llm.provider import get_provider as get_llm_provider, get_telemetry as get_llm_telemetry
 
+try:
+    import orjson
+except ImportError:  # optional accelerator; stdlib json is used otherwise
+    orjson = None
+
+try:
+    from serpapi import GoogleSearch
+except ImportError:  # resource search reports the missing package when it is used
+    GoogleSearch = None
+
+
+def _json_loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, e.g. for NDJSON stream lines."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_dumps_pretty(obj: Any) -> bytes:
+    """Indented UTF-8 JSON, as written for the on-disk caches."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+class _ORJSONResponse(JSONResponse):
+    """Default response class: orjson encoding when installed, Starlette's json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        # jsonable_encoder can leave int keys in place; stdlib json would stringify them.
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
 
 def _quiz_module():
     """Import quiz generator with support for different working directories."""
@@ -71,6 +119,10 @@ class DetectTopicResponse(BaseModel):
     subtopics: list[str] = []
     raw: str | None = None
 
+
+class DetectTopicBatchRequest(BaseModel):
+    items: list[DetectTopicRequest]
+
 load_dotenv()
 setup_logging()
 log = logging.getLogger("ala")
@@ -78,22 +130,60 @@ validate_config()
 
 api_key = GOOGLE_API_KEY
 
+SUMMARY_SYSTEM_PROMPT = (
+    "You are an assistant inside an adaptive learning app.\n"
+    "Summarize the captured on-screen content for the learner.\n"
+    "- Output a concise summary in 4-8 bullet points\n"
+    "- Focus on the educational/technical concepts\n"
+    "- Ignore navigation/UI noise and repeated text\n"
+    "- Do not include any sensitive/personal data"
+)
+
 _gemini_ready = bool(api_key)
 if _gemini_ready:
     genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-2.5-flash")
-else:
-    model = None
+
+
+@lru_cache(maxsize=8)
+def get_gemini_model(system_instruction: str | None = None, temperature: float | None = None) -> Any:
+    """Return a shared GenerativeModel specialized for one kind of prompt, or None without a key."""
+    if not _gemini_ready:
+        return None
+    generation_config = {"temperature": temperature} if temperature is not None else None
+    return genai.GenerativeModel(
+        "gemini-2.5-flash", system_instruction=system_instruction, generation_config=generation_config
+    )
+
+
+model = get_gemini_model()
 
 limiter = Limiter(key_func=get_remote_address)
 
-def ask_gemini(prompt: str) -> str:
-    if model is None:
+def ask_gemini(prompt: str, gemini_model: Any = None) -> str:
+    gemini_model = gemini_model or model
+    if gemini_model is None:
+        raise RuntimeError(
+            "Gemini API key not found. Set GOOGLE_API_KEY or GEMINI_API_KEY in your environment or .env file."
+        )
+
+    response = gemini_model.generate_content(prompt)
+    return response.text
+
+
+# Created unbound; it attaches to the running loop on first use.
+_gemini_sem = asyncio.Semaphore(max(1, GEMINI_CONCURRENCY))
+
+
+async def ask_gemini_async(prompt: str, gemini_model: Any = None) -> str:
+    """Awaitable ask_gemini: waits on the event loop instead of holding a threadpool worker."""
+    gemini_model = gemini_model or model
+    if gemini_model is None:
         raise RuntimeError(
             "Gemini API key not found. Set GOOGLE_API_KEY or GEMINI_API_KEY in your environment or .env file."
         )
 
-    response = model.generate_content(prompt)
+    async with _gemini_sem:
+        response = await gemini_model.generate_content_async(prompt)
     return response.text
 
 
@@ -101,6 +191,7 @@ app = FastAPI(
     title="Adaptive Learning Agent API",
     description="AI-powered adaptive learning system with real-time content detection and personalized learning paths",
     version="1.0.0",
+    default_response_class=_ORJSONResponse,
 )
 app.state.limiter = limiter
 
@@ -134,11 +225,21 @@ def _backend_dir() -> Path:
     return Path(__file__).resolve().parent
 
 
+# Maps every byte outside [a-z0-9] to "-"; non-ASCII characters are encoded as "?" first.
+_SLUG_TABLE = bytes(
+    c if chr(c) in string.ascii_lowercase or chr(c) in string.digits else ord("-") for c in range(256)
+)
+_WS = re.compile(r"\s+")
+_FENCE_OPEN = re.compile(r"^```[a-zA-Z]*\n")
+_FENCE_CLOSE = re.compile(r"\n```$")
+_JSON_OBJECT = re.compile(r"\{[\s\S]*\}")
+
+
+@lru_cache(maxsize=4096)
 def _slugify(value: str) -> str:
-    value = (value or "").strip().lower()
-    value = re.sub(r"[^a-z0-9]+", "-", value)
-    value = re.sub(r"-+", "-", value).strip("-")
-    return value or "topic"
+    raw = (value or "").lower().encode("ascii", "replace").translate(_SLUG_TABLE)
+    # Splitting on "-" and dropping empty parts collapses runs and trims the ends in one pass.
+    return b"-".join(part for part in raw.split(b"-") if part).decode("ascii") or "topic"
 
 
 class DetectorSnippet(BaseModel):
@@ -161,6 +262,10 @@ class DetectedTopic(BaseModel):
     summary: str | None = None
 
 
+class TopicSummariesResponse(BaseModel):
+    summaries: dict[str, str | None]
+
+
 class ResourceItem(BaseModel):
     title: str
     url: str
@@ -258,7 +363,7 @@ def _clean_str_list(x: Any, max_items: int = 10) -> list[str]:
     for item in x:
         if not isinstance(item, str):
             continue
-        s = re.sub(r"\s+", " ", item).strip(" \t\r\n-•*")
+        s = _WS.sub(" ", item).strip(" \t\r\n-•*")
         if not s:
             continue
         key = s.lower()
@@ -313,7 +418,7 @@ def _build_explainer(topic_title: str, subtopic_title: str) -> dict[str, Any]:
     overview = obj.get("overview")
     if not isinstance(overview, str) or not overview.strip():
         overview = f"An explainer for {subtopic_title}."
-    overview = re.sub(r"\s+", " ", overview).strip()
+    overview = _WS.sub(" ", overview).strip()
 
     # Normalize sections
     sections_in = obj.get("sections")
@@ -450,9 +555,11 @@ def _load_quiz_json(path: Path) -> dict[str, Any]:
     return data
 
 
+@lru_cache(maxsize=1024)
 def _domain_from_url(url: str) -> str:
+    # Cached: SerpAPI responses are themselves cached, so the same URLs are re-scored on repeat queries.
     try:
-        host = urlparse(url).netloc.lower()
+        host = urlsplit(url).netloc.lower()
     except Exception:
         return ""
     if host.startswith("www."):
@@ -501,7 +608,7 @@ _TRUSTED_VIDEO_CHANNELS: dict[str, int] = {
 }
 
 
-_DOMAIN_BLOCKLIST: set[str] = {
+_DOMAIN_BLOCKLIST: frozenset[str] = frozenset({
     "reddit.com",
     "quora.com",
     "pinterest.com",
@@ -510,49 +617,58 @@ _DOMAIN_BLOCKLIST: set[str] = {
     "tiktok.com",
     "x.com",
     "twitter.com",
-}
+})
+
+
+def _domain_suffixes(domain: str) -> list[str]:
+    """``"docs.python.org"`` -> ``["docs.python.org", "python.org", "org"]``."""
+    out = [domain]
+    i = domain.find(".")
+    while i != -1:
+        out.append(domain[i + 1 :])
+        i = domain.find(".", i + 1)
+    return out
 
 
 def _domain_base_score(domain: str) -> int:
     if not domain:
         return 0
-    for bad in _DOMAIN_BLOCKLIST:
-        if domain == bad or domain.endswith("." + bad):
-            return -999
-    base = 0
-    for trusted, pts in _TRUSTED_DOMAINS.items():
-        if domain == trusted or domain.endswith("." + trusted):
-            base = max(base, pts)
+    # One hash lookup per label suffix instead of scanning every listed domain.
+    suffixes = _domain_suffixes(domain)
+    if any(sfx in _DOMAIN_BLOCKLIST for sfx in suffixes):
+        return -999
+    base = max((_TRUSTED_DOMAINS.get(sfx, 0) for sfx in suffixes), default=0)
     # Generic trust for academic/government sites
     if base <= 0 and (domain.endswith(".edu") or domain.endswith(".gov")):
         base = 55
     return base
 
 
-def _score_resource(title: str, snippet: str, url: str, base: int = 0) -> int:
-    text = f"{title} {snippet}".lower()
+# Positive keywords for resource ranking. Overlaps are intentional: "for beginners" also scores "beginner".
+_RESOURCE_KEYWORDS: tuple[tuple[str, int], ...] = (
+    ("official", 30),
+    ("documentation", 25),
+    ("docs", 10),
+    ("reference", 15),
+    ("tutorial", 20),
+    ("beginner", 20),
+    ("for beginners", 25),
+    ("crash course", 15),
+    ("guide", 15),
+    ("getting started", 20),
+    ("examples", 10),
+    ("best practices", 10),
+)
+
+
+def _score_resource(text_l: str, url_l: str, base: int = 0) -> int:
+    """Score a result from its lowercased ``"title snippet"`` text and lowercased URL."""
     score = int(base)
 
     # Positive keywords
-    for kw, pts in (
-        ("official", 30),
-        ("documentation", 25),
-        ("docs", 10),
-        ("reference", 15),
-        ("tutorial", 20),
-        ("beginner", 20),
-        ("for beginners", 25),
-        ("crash course", 15),
-        ("guide", 15),
-        ("getting started", 20),
-        ("examples", 10),
-        ("best practices", 10),
-    ):
-        if kw in text:
-            score += pts
+    score += sum(pts for kw, pts in _RESOURCE_KEYWORDS if kw in text_l)
 
     # URL signals
-    url_l = (url or "").lower()
     if "/docs" in url_l or "docs." in url_l:
         score += 10
     if url_l.endswith(".pdf"):
@@ -583,13 +699,15 @@ def _extract_serp_resources(results: dict[str, Any], query: str, limit: int) ->
             if url in seen_urls:
                 continue
 
-            domain = _domain_from_url(url)
+            # Lowercase once; the domain, domain score and keyword score all reuse it.
+            url_l = url.lower()
+            domain = _domain_from_url(url_l)
             base = _domain_base_score(domain)
             if base < 0:
                 continue
 
             snippet = str(r.get("snippet") or "").strip() or None
-            score = _score_resource(title, snippet or "", url, base=base)
+            score = _score_resource(f"{title} {snippet or ''}".lower(), url_l, base=base)
 
             # If not trusted/edu/gov, only keep if it still scores well.
             if base == 0 and score < 70:
@@ -598,7 +716,7 @@ def _extract_serp_resources(results: dict[str, Any], query: str, limit: int) ->
             res_type = "docs" if ("docs" in domain or domain.endswith("python.org")) else "article"
 
             items.append(
-                ResourceItem(
+                ResourceItem.model_construct(
                     title=title,
                     url=url,
                     type=res_type,
@@ -638,10 +756,10 @@ def _extract_serp_resources(results: dict[str, Any], query: str, limit: int) ->
             continue
 
         snippet = str(v.get("snippet") or v.get("description") or "").strip() or None
-        score = _score_resource(title, snippet or "", url, base=base)
+        score = _score_resource(f"{title} {snippet or ''}".lower(), url.lower(), base=base)
 
         items.append(
-            ResourceItem(
+            ResourceItem.model_construct(
                 title=title,
                 url=url,
                 type="video",
@@ -652,27 +770,36 @@ def _extract_serp_resources(results: dict[str, Any], query: str, limit: int) ->
         )
         seen_urls.add(url)
 
-    # Sort and trim
-    items.sort(key=lambda x: x.score, reverse=True)
+    # Keep the top n; nlargest is a partial sort with the same tie order as a stable reverse sort.
     hard_cap = 60
     n = int(limit) if isinstance(limit, int) or (isinstance(limit, str) and str(limit).isdigit()) else 0
     if n <= 0:
         n = hard_cap
     n = max(1, min(n, hard_cap))
-    return items[:n]
+    return heapq.nlargest(n, items, key=attrgetter("score"))
+
+
+_serp_cache_lock = threading.Lock()
+# (query, location) -> (fetched_at, raw SerpAPI response), oldest first.
+_serp_cache: OrderedDict[tuple[str, str], tuple[float, dict[str, Any]]] = OrderedDict()
 
 
 def _serp_search(query: str, location: str | None = None) -> dict[str, Any]:
+    key = (query, location or "")
+    with _serp_cache_lock:
+        hit = _serp_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < SERP_CACHE_TTL_SEC:
+            _serp_cache.move_to_end(key)
+            return hit[1]
+
     serp_key = os.getenv("SERPAPI_API_KEY") or os.getenv("SERP_API_KEY")
     if not serp_key:
         raise RuntimeError("SerpAPI key not found. Set SERPAPI_API_KEY (or SERP_API_KEY).")
 
-    try:
-        from serpapi import GoogleSearch
-    except Exception as e:
+    if GoogleSearch is None:
         raise RuntimeError(
             "SerpAPI client not installed. Install backend requirements (google-search-results)."
-        ) from e
+        )
 
     params = {
         "engine": "google",
@@ -686,18 +813,70 @@ def _serp_search(query: str, location: str | None = None) -> dict[str, Any]:
         params["location"] = location
 
     search = GoogleSearch(params)
-    return search.get_dict()
+    result = search.get_dict()
+
+    # Only cache successful responses so a transient SerpAPI error isn't served for an hour.
+    if SERP_CACHE_SIZE > 0 and isinstance(result, dict) and not result.get("error"):
+        with _serp_cache_lock:
+            _serp_cache[key] = (time.monotonic(), result)
+            _serp_cache.move_to_end(key)
+            while len(_serp_cache) > SERP_CACHE_SIZE:
+                _serp_cache.popitem(last=False)
+    return result
+
+
+def _output_log_path() -> Path:
+    return _backend_dir() / "output.jsonl"
 
 
-def _read_output_entries() -> list[dict[str, Any]]:
-    path = _backend_dir() / "output.json"
+def _legacy_output_path() -> Path:
+    return _backend_dir() / "output.json"
+
+
+# ocr.py appends one JSON object per line to output.jsonl. We remember how far into
+# the file we've parsed so each request only pays for captures added since the last one.
+_entries_lock = threading.Lock()
+_entries_offset = 0
+_entries_accum: list[dict[str, Any]] = []
+_topic_index: dict[str, list[int]] = {}
+_legacy_cache: tuple[tuple[int, int], list[dict[str, Any]], dict[str, list[int]]] | None = None
+
+
+def _entry_topic(e: dict[str, Any]) -> str | None:
+    """Topic title a capture entry belongs to, or None if it carries no OCR text."""
+    # Expected capture entry shape (from ocr.py):
+    # {"title": <window title>, "ocr_text": <text>, "server": {"topic": ..., "subtopics": [...] } }
+    # Back-compat: some runs used "server_response" instead of "server".
+    ocr_text = (e.get("ocr_text") or "").strip()
+    if not ocr_text:
+        return None
+
+    server_resp = e.get("server_response")
+    if not isinstance(server_resp, dict):
+        server_resp = e.get("server")
+    topic = ""
+    if isinstance(server_resp, dict):
+        topic = (server_resp.get("topic") or "").strip() or (server_resp.get("response") or "").strip()
+
+    if not topic:
+        # If OCR is running but topic extraction isn't wired, fall back to window title.
+        topic = (e.get("title") or "").strip() or "Detected topic"
+    return topic
+
+
+def _index_entries(entries: list[dict[str, Any]], start: int, index: dict[str, list[int]]) -> None:
+    for i in range(start, len(entries)):
+        topic = _entry_topic(entries[i])
+        if topic is not None:
+            index.setdefault(_slugify(topic), []).append(i)
+
+
+def _read_legacy_output_entries() -> list[dict[str, Any]]:
+    path = _legacy_output_path()
     if not path.exists():
         return []
     try:
-        import json
-
-        with path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _json_loads(path.read_bytes())
         if isinstance(data, list):
             return [x for x in data if isinstance(x, dict)]
         return []
@@ -705,8 +884,85 @@ def _read_output_entries() -> list[dict[str, Any]]:
         return []
 
 
+def _read_legacy_indexed_entries() -> tuple[list[dict[str, Any]], dict[str, list[int]]]:
+    """Parse and index ``output.json``, reusing the last result while its mtime and size are unchanged."""
+    global _legacy_cache
+    path = _legacy_output_path()
+    try:
+        st = path.stat()
+    except OSError:
+        return [], {}
+    key = (st.st_mtime_ns, st.st_size)
+
+    with _entries_lock:
+        if _legacy_cache is not None and _legacy_cache[0] == key:
+            return _legacy_cache[1], _legacy_cache[2]
+
+    entries = _read_legacy_output_entries()
+    index: dict[str, list[int]] = {}
+    _index_entries(entries, 0, index)
+    with _entries_lock:
+        _legacy_cache = (key, entries, index)
+    return entries, index
+
+
+def _read_indexed_entries() -> tuple[list[dict[str, Any]], dict[str, list[int]]]:
+    """Return every capture entry plus a ``topic_id -> [entry index]`` map.
+
+    Only the bytes appended since the last call are parsed and indexed. Both
+    containers are shared between requests; callers must not mutate them.
+    Falls back to the legacy ``output.json`` array when no JSONL log exists yet.
+    """
+    global _entries_offset, _entries_accum, _topic_index
+    path = _output_log_path()
+    if not path.exists():
+        return _read_legacy_indexed_entries()
+
+    with _entries_lock:
+        start = len(_entries_accum)
+        try:
+            size = path.stat().st_size
+            if size < _entries_offset:
+                # Log was truncated or replaced; start over.
+                _entries_offset = 0
+                _entries_accum = []
+                _topic_index = {}
+                start = 0
+
+            if size == _entries_offset:
+                # Nothing appended since the last call; skip opening the file.
+                return _entries_accum, _topic_index
+
+            with path.open("rb") as f:
+                f.seek(_entries_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # The writer hasn't finished this line yet; pick it up next time.
+                        break
+                    _entries_offset += len(line)
+                    try:
+                        obj = _json_loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(obj, dict):
+                        _entries_accum.append(obj)
+        except OSError as e:
+            log.warning("Could not read %s: %s", path, e)
+
+        _index_entries(_entries_accum, start, _topic_index)
+        return _entries_accum, _topic_index
+
+
 _summary_lock = threading.Lock()
 _summary_cache: dict[str, dict[str, str]] | None = None
+# Topic ids whose summary is currently being regenerated.
+_summary_refreshing: set[str] = set()
+_SUMMARY_FLUSH_DELAY_SEC = 2.0
+_summary_flush_lock = threading.Lock()
+_summary_flush_timer: threading.Timer | None = None
+_summary_flush_path: Path | None = None
+_SUMMARY_FANOUT = 5
+_SUMMARY_BATCH_MAX = 20
 
 
 def _summary_cache_path() -> Path:
@@ -725,8 +981,7 @@ def _load_summary_cache() -> dict[str, dict[str, str]]:
             return _summary_cache
 
         try:
-            with path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = _json_loads(path.read_bytes())
             if isinstance(data, dict):
                 # { topic_id: { "hash": "...", "summary": "..." } }
                 _summary_cache = {
@@ -740,49 +995,77 @@ def _load_summary_cache() -> dict[str, dict[str, str]]:
         return _summary_cache
 
 
-def _save_summary_cache(cache: dict[str, dict[str, str]]) -> None:
-    path = _summary_cache_path()
+def _save_summary_cache(cache: dict[str, dict[str, str]], path: Path | None = None) -> None:
+    path = path or _summary_cache_path()
+    tmp = path.with_suffix(".json.tmp")
     try:
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(cache, f, indent=2, ensure_ascii=False)
+        # Write to a sibling file and swap it in so a crash never leaves a torn cache.
+        with tmp.open("wb") as f:
+            f.write(_json_dumps_pretty(cache))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
     except Exception:
         # Cache is best-effort; ignore write failures.
         pass
 
 
-def _entries_for_topic(entries: list[dict[str, Any]], topic_id: str) -> list[dict[str, Any]]:
-    out = []
-    for e in entries:
-        ocr_text = (e.get("ocr_text") or "").strip()
-        if not ocr_text:
-            continue
+def _schedule_summary_cache_flush() -> None:
+    """Mark the summary cache dirty; the first update in a burst arms one delayed flush.
 
-        server_resp = e.get("server_response")
-        if not isinstance(server_resp, dict):
-            server_resp = e.get("server")
-        topic = ""
-        if isinstance(server_resp, dict):
-            topic = (server_resp.get("topic") or "").strip() or (server_resp.get("response") or "").strip()
-        if not topic:
-            topic = (e.get("title") or "").strip() or "Detected topic"
-
-        if _slugify(topic) == topic_id:
-            out.append(e)
-    return out
+    Caller must hold ``_summary_lock``.
+    """
+    global _summary_flush_timer, _summary_flush_path
+    _summary_flush_path = _summary_cache_path()
+    if _summary_flush_timer is None:
+        _summary_flush_timer = threading.Timer(_SUMMARY_FLUSH_DELAY_SEC, _flush_summary_cache)
+        _summary_flush_timer.daemon = True
+        _summary_flush_timer.start()
+
+
+def _flush_summary_cache() -> None:
+    global _summary_flush_timer, _summary_flush_path
+    # Serialize flushes so an older snapshot can never be written after a newer one.
+    with _summary_flush_lock:
+        with _summary_lock:
+            if _summary_flush_timer is not None:
+                _summary_flush_timer.cancel()
+            _summary_flush_timer = None
+            path, _summary_flush_path = _summary_flush_path, None
+            if path is None or _summary_cache is None:
+                return
+            snapshot = dict(_summary_cache)
+        _save_summary_cache(snapshot, path)
+
+
+# Pending summaries are written out on interpreter shutdown as well.
+atexit.register(_flush_summary_cache)
+
+
+def _entries_for_topic(
+    entries: list[dict[str, Any]], index: dict[str, list[int]], topic_id: str
+) -> list[dict[str, Any]]:
+    return [entries[i] for i in index.get(topic_id, ())]
 
 
 def _build_summary_input(entries: list[dict[str, Any]]) -> str:
     # Build a compact prompt input: include window title + OCR text snippets.
-    chunks: list[str] = []
-    for e in entries[-12:]:
+    # Walk backwards so older entries are skipped once the 6000-char cap is covered.
+    chunks: deque[str] = deque()
+    size = -1
+    for e in reversed(entries[-12:]):
         title = (e.get("title") or "").strip() or "Active window"
         text = (e.get("ocr_text") or "").strip()
         if not text:
             continue
-        text = re.sub(r"\s+", " ", text)
+        text = _WS.sub(" ", text)
         if len(text) > 900:
             text = text[:900].rstrip() + "…"
-        chunks.append(f"[{title}] {text}")
+        chunk = f"[{title}] {text}"
+        chunks.appendleft(chunk)
+        size += len(chunk) + 1
+        if size >= 6000:
+            break
 
     combined = "\n".join(chunks).strip()
     # Hard cap to keep requests cheap.
@@ -791,55 +1074,108 @@ def _build_summary_input(entries: list[dict[str, Any]]) -> str:
     return combined
 
 
+def _summary_prompt(topic_title: str, captured: str) -> str:
+    # The instructions live in the model's system_instruction; only the capture is sent.
+    return f"Detected topic: {topic_title}\n\nCaptured content:\n{captured}\n"
+
+
+def _local_summary(captured: str) -> str:
+    # Fallback when Gemini is unavailable: lightweight local summary (first lines)
+    return captured[:500].rstrip() + ("…" if len(captured) > 500 else "")
+
+
 def _summarize_captured_content(topic_title: str, captured: str) -> str:
     if not captured.strip():
         return "No captured content yet."
 
-    prompt = (
-        "You are an assistant inside an adaptive learning app.\n"
-        "Summarize the captured on-screen content for the learner.\n"
-        "- Output a concise summary in 4-8 bullet points\n"
-        "- Focus on the educational/technical concepts\n"
-        "- Ignore navigation/UI noise and repeated text\n"
-        "- Do not include any sensitive/personal data\n\n"
-        f"Detected topic: {topic_title}\n\n"
-        "Captured content:\n"
-        f"{captured}\n"
-    )
+    prompt = _summary_prompt(topic_title, captured)
 
     try:
-        return ask_gemini(prompt).strip() or "(Empty summary)"
+        return ask_gemini(prompt, get_gemini_model(SUMMARY_SYSTEM_PROMPT)).strip() or "(Empty summary)"
     except Exception:
-        # Fallback: lightweight local summary (first lines)
-        return captured[:500].rstrip() + ("…" if len(captured) > 500 else "")
+        return _local_summary(captured)
+
+
+def _summary_content_hash(captured: str) -> tuple[bytes, str]:
+    data = captured.encode("utf-8", errors="ignore")
+    # Only an equality key for cache invalidation, so a fast non-cryptographic-strength digest is enough.
+    return data, hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _cached_summary(
+    cache: dict[str, dict[str, str]], topic_id: str, data: bytes, content_hash: str
+) -> tuple[str | None, bool]:
+    """Return ``(summary, is_current)`` for the topic. Caller must hold ``_summary_lock``."""
+    existing = cache.get(topic_id)
+    if not isinstance(existing, dict):
+        return None, False
+    summary = existing.get("summary")
+    if not isinstance(summary, str) or not summary.strip():
+        return None, False
+    stored_hash = existing.get("hash")
+    is_current = stored_hash == content_hash or (
+        # Entries written before the switch from SHA-256 stay valid until their content changes.
+        isinstance(stored_hash, str)
+        and len(stored_hash) == 64
+        and stored_hash == hashlib.sha256(data).hexdigest()
+    )
+    return summary, is_current
+
+
+def _store_topic_summary(topic_id: str, content_hash: str, summary: str) -> None:
+    cache = _load_summary_cache()
+    with _summary_lock:
+        cache[topic_id] = {"hash": content_hash, "summary": summary}
+        _schedule_summary_cache_flush()
+
+
+def _refresh_topic_summary(topic_id: str, topic_title: str, captured: str, content_hash: str) -> str:
+    try:
+        summary = _summarize_captured_content(topic_title, captured)
+        _store_topic_summary(topic_id, content_hash, summary)
+        return summary
+    finally:
+        with _summary_lock:
+            _summary_refreshing.discard(topic_id)
+
 
+def get_topic_summary(
+    topic_id: str, topic_title: str, topic_entries: list[dict[str, Any]], allow_stale: bool = False
+) -> str | None:
+    """Return the cached summary for the topic's current captures, generating it if needed.
 
-def get_topic_summary(topic_id: str, topic_title: str, entries: list[dict[str, Any]]) -> str | None:
-    topic_entries = _entries_for_topic(entries, topic_id)
+    With ``allow_stale``, an outdated summary is returned immediately and regenerated
+    on a background thread, so the caller never waits on Gemini when one exists.
+    """
     captured = _build_summary_input(topic_entries)
     if not captured:
         return None
 
-    content_hash = hashlib.sha256(captured.encode("utf-8", errors="ignore")).hexdigest()
+    data, content_hash = _summary_content_hash(captured)
     cache = _load_summary_cache()
 
     with _summary_lock:
-        existing = cache.get(topic_id)
-        if isinstance(existing, dict) and existing.get("hash") == content_hash:
-            summary = existing.get("summary")
-            if isinstance(summary, str) and summary.strip():
+        summary, is_current = _cached_summary(cache, topic_id, data, content_hash)
+        if summary is not None:
+            if is_current:
                 return summary
+            if allow_stale:
+                if topic_id not in _summary_refreshing:
+                    _summary_refreshing.add(topic_id)
+                    threading.Thread(
+                        target=_refresh_topic_summary,
+                        args=(topic_id, topic_title, captured, content_hash),
+                        daemon=True,
+                    ).start()
+                return summary
+        _summary_refreshing.add(topic_id)
 
-    summary = _summarize_captured_content(topic_title, captured)
-
-    with _summary_lock:
-        cache[topic_id] = {"hash": content_hash, "summary": summary}
-        _save_summary_cache(cache)
-
-    return summary
+    return _refresh_topic_summary(topic_id, topic_title, captured, content_hash)
 
 
-def _build_topics_from_entries(entries: list[dict[str, Any]]) -> list[DetectedTopic]:
+def _build_topics_from_entries(
+    entries: list[dict[str, Any]], index: dict[str, list[int]] | None = None
+) -> list[DetectedTopic]:
     # Expected capture entry shape (from ocr.py):
     # {"title": <window title>, "ocr_text": <text>, "server": {"topic": ..., "subtopics": [...] } }
     # Back-compat: some runs used "server_response" instead of "server".
@@ -855,7 +1191,7 @@ def _build_topics_from_entries(entries: list[dict[str, Any]]) -> list[DetectedTo
         for x in items:
             if not isinstance(x, str):
                 continue
-            s = re.sub(r"\s+", " ", x).strip(" \t\r\n-•*\"")
+            s = _WS.sub(" ", x).strip(" \t\r\n-•*\"")
             if not s:
                 continue
             key = s.lower()
@@ -867,56 +1203,55 @@ def _build_topics_from_entries(entries: list[dict[str, Any]]) -> list[DetectedTo
                 break
         return out
 
-    for e in entries:
-        ocr_text = (e.get("ocr_text") or "").strip()
-        if not ocr_text:
-            continue
-
-        server_resp = e.get("server_response")
-        if not isinstance(server_resp, dict):
-            server_resp = e.get("server")
-        topic = ""
-        if isinstance(server_resp, dict):
-            topic = (server_resp.get("topic") or "").strip() or (server_resp.get("response") or "").strip()
-
-        if not topic:
-            # If OCR is running but topic extraction isn't wired, fall back to window title.
-            topic = (e.get("title") or "").strip() or "Detected topic"
-
-        topic_id = _slugify(topic)
-        window_title = (e.get("title") or "").strip() or "Active window"
-
-        if topic_id not in by_topic:
-            by_topic[topic_id] = DetectedTopic(
-                id=topic_id,
-                title=topic,
-                level="intermediate",
-                confidence=None,
-                tags=[],
-                detectedAt=None,
-                snippets=[],
-                detectedConcepts=[],
-                subtopics=[],
+    if index is None:
+        index = {}
+        _index_entries(entries, 0, index)
+
+    # The index already holds each entry's topic id, so nothing is re-derived or re-slugified here.
+    # Snapshot the items: the shared index may gain topics while a concurrent request reads the log.
+    for topic_id, positions in list(index.items()):
+        for i in positions:
+            e = entries[i]
+            ocr_text = (e.get("ocr_text") or "").strip()
+
+            server_resp = e.get("server_response")
+            if not isinstance(server_resp, dict):
+                server_resp = e.get("server")
+            window_title = (e.get("title") or "").strip() or "Active window"
+
+            if topic_id not in by_topic:
+                by_topic[topic_id] = DetectedTopic.model_construct(
+                    id=topic_id,
+                    title=_entry_topic(e) or "Detected topic",
+                    level="intermediate",
+                    confidence=None,
+                    tags=[],
+                    detectedAt=None,
+                    snippets=[],
+                    detectedConcepts=[],
+                    subtopics=[],
+                )
+                subtopic_keys[topic_id] = set()
+
+            # Merge subtopics captured in output.json (dedupe, keep stable order).
+            if isinstance(server_resp, dict):
+                seen = subtopic_keys.setdefault(topic_id, set())
+                for st in _clean_subtopics(server_resp.get("subtopics")):
+                    key = st.lower()
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    by_topic[topic_id].subtopics.append(st)
+
+            snippet_text = ocr_text
+            if len(snippet_text) > 220:
+                snippet_text = snippet_text[:220].rstrip() + "…"
+
+            by_topic[topic_id].snippets.append(
+                DetectorSnippet.model_construct(
+                    source="screen", where=window_title, text=snippet_text, strength="medium"
+                )
             )
-            subtopic_keys[topic_id] = set()
-
-        # Merge subtopics captured in output.json (dedupe, keep stable order).
-        if isinstance(server_resp, dict):
-            seen = subtopic_keys.setdefault(topic_id, set())
-            for st in _clean_subtopics(server_resp.get("subtopics")):
-                key = st.lower()
-                if key in seen:
-                    continue
-                seen.add(key)
-                by_topic[topic_id].subtopics.append(st)
-
-        snippet_text = ocr_text
-        if len(snippet_text) > 220:
-            snippet_text = snippet_text[:220].rstrip() + "…"
-
-        by_topic[topic_id].snippets.append(
-            DetectorSnippet(source="screen", where=window_title, text=snippet_text, strength="medium")
-        )
 
     # Enrich topics with real confidence, level, and summary derived from data
     try:
@@ -963,78 +1298,144 @@ def _build_topics_from_entries(entries: list[dict[str, Any]]) -> list[DetectedTo
 
     # Return in stable order (most recent last in file tends to be newest; reverse for UI)
     topics = list(by_topic.values())
-    topics.sort(key=lambda t: t.title)
+    topics.sort(key=attrgetter("title"))
     return topics
 
 
+def _build_topic_by_id(
+    topic_id: str,
+    entries: list[dict[str, Any]] | None = None,
+    index: dict[str, list[int]] | None = None,
+) -> DetectedTopic | None:
+    """Build one topic from its index bucket instead of building every topic."""
+    if entries is None or index is None:
+        entries, index = _read_indexed_entries()
+    topics = _build_topics_from_entries(entries, {topic_id: index.get(topic_id, [])})
+    return topics[0] if topics else None
+
+
 # OCR PROCESS MANAGEMENT
 
+# One long-lived `ocr.py --worker` process; start/stop only toggle its capture session.
 _ocr_process = None
+_ocr_capturing = False
 _ocr_lock = threading.Lock()
-
-
-def _stop_flag_path() -> Path:
-    return _backend_dir() / "stop.flag"
+_OCR_STOP_GRACE_SEC = 2
+_OCR_SCRIPT_PATH = Path(__file__).with_name("ocr.py")
 
 
 def _ocr_log_path() -> Path:
     return _backend_dir() / "ocr.log"
 
 
-def _ocr_script_path() -> Path:
-    return Path(__file__).with_name("ocr.py")
+def _tail_lines(path: Path, n: int, block_size: int = 64 * 1024) -> list[str]:
+    """Return the last ``n`` lines of ``path``, reading backwards from EOF in blocks."""
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        # One extra newline guarantees the first kept line is complete.
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return data.decode("utf-8", errors="replace").splitlines()[-n:]
 
 
-def is_ocr_running() -> bool:
+def _ocr_worker_alive() -> bool:
+    # Caller holds _ocr_lock.
+    return _ocr_process is not None and _ocr_process.poll() is None
+
+
+def _ocr_worker() -> subprocess.Popen:
+    """Return the OCR worker, spawning it on first use or after it died. Caller holds _ocr_lock."""
     global _ocr_process
+    if _ocr_worker_alive():
+        return _ocr_process
+
+    script_path = _OCR_SCRIPT_PATH
+    if not script_path.exists():
+        raise RuntimeError(f"OCR script not found at {script_path}")
+
+    log_path = _ocr_log_path()
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    # The child inherits its own copy of the descriptor, so ours can be closed
+    # right away. "-u" keeps the child's output unbuffered so /ocr/log stays current.
+    with open(log_path, "a", encoding="utf-8") as log_file:
+        _ocr_process = subprocess.Popen(
+            [sys.executable, "-u", str(script_path), "--worker"],
+            cwd=str(script_path.parent),
+            stdout=log_file,
+            stderr=log_file,
+            stdin=subprocess.PIPE,
+            text=True,
+        )
+    return _ocr_process
+
+
+def _send_ocr_command(command: str) -> bool:
+    """Write one control line to the worker. Caller holds _ocr_lock."""
+    try:
+        _ocr_process.stdin.write(command + "\n")
+        _ocr_process.stdin.flush()
+        return True
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def is_ocr_running() -> bool:
     with _ocr_lock:
-        return _ocr_process is not None and _ocr_process.poll() is None
-    
+        return _ocr_capturing and _ocr_worker_alive()
+
 
 def start_ocr() -> bool:
-    global _ocr_process
+    global _ocr_capturing
     with _ocr_lock:
-        if _ocr_process is not None and _ocr_process.poll() is None:
+        if _ocr_capturing and _ocr_worker_alive():
             return False
 
-        stop_file = _stop_flag_path()
-        if stop_file.exists():
-            stop_file.unlink()
-
-        script_path = _ocr_script_path()
-        if not script_path.exists():
-            raise RuntimeError(f"OCR script not found at {script_path}")
+        _ocr_worker()
+        if not _send_ocr_command("START"):
+            raise RuntimeError("OCR worker exited before it could start capturing")
+        _ocr_capturing = True
+        return True
 
-        backend_dir = script_path.parent
 
-        log_path = _ocr_log_path()
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        log_file = open(log_path, "a", encoding="utf-8")
-        
-        _ocr_process = subprocess.Popen(
-            [sys.executable, str(script_path)],
-            cwd=str(backend_dir),
-            stdout=log_file,
-            stderr=log_file,
-            stdin=subprocess.DEVNULL,
-        )
-        return True 
-    
 def stop_ocr() -> bool:
-    global _ocr_process
+    global _ocr_capturing
     with _ocr_lock:
-        if _ocr_process is None:
+        if not _ocr_capturing:
             return False
 
-        _stop_flag_path().touch()
+        # The worker flushes the open window itself; nothing here waits on it.
+        _ocr_capturing = False
+        if _ocr_worker_alive():
+            _send_ocr_command("STOP")
+        return True
+
 
+def _shutdown_ocr_worker() -> None:
+    """Close the worker's stdin (EOF = flush and exit), escalating if it does not exit."""
+    global _ocr_process, _ocr_capturing
+    with _ocr_lock:
+        proc, _ocr_process, _ocr_capturing = _ocr_process, None, False
+    if proc is None:
+        return
+    try:
+        proc.stdin.close()
+    except OSError:
+        pass
+    try:
+        proc.wait(timeout=_OCR_STOP_GRACE_SEC)
+    except subprocess.TimeoutExpired:
+        proc.terminate()
         try:
-            _ocr_process.wait(timeout=10)
+            proc.wait(timeout=_OCR_STOP_GRACE_SEC)
         except subprocess.TimeoutExpired:
-            _ocr_process.kill()
+            proc.kill()
 
-        _ocr_process = None
-        return True
+
+atexit.register(_shutdown_ocr_worker)
 
 
 # MIDDLEWARE
@@ -1068,12 +1469,12 @@ def read_root():
 
 @app.post("/ask", response_model=AskResponse)
 @limiter.limit(RATE_LIMIT_AI)
-def ask_ai(request: Request, data: AskRequest):
+async def ask_ai(request: Request, data: AskRequest):
     if not data.prompt.strip():
         raise HTTPException(status_code=400, detail="Prompt cannot be empty")
 
     try:
-        answer = ask_gemini(data.prompt)
+        answer = await ask_gemini_async(data.prompt)
         return {"response": answer}
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -1081,109 +1482,355 @@ def ask_ai(request: Request, data: AskRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/detect/topic", response_model=DetectTopicResponse)
+@app.post("/ask/stream")
 @limiter.limit(RATE_LIMIT_AI)
-def detect_topic(request: Request, data: DetectTopicRequest):
-    text = (data.text or "").strip()
-    if not text:
-        raise HTTPException(status_code=400, detail="text cannot be empty")
+async def ask_ai_stream(request: Request, data: AskRequest):
+    """Stream the answer as NDJSON ``{"delta": ...}`` lines, ending with ``{"done": true}``."""
+    if not data.prompt.strip():
+        raise HTTPException(status_code=400, detail="Prompt cannot be empty")
+    if model is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Gemini API key not found. Set GOOGLE_API_KEY or GEMINI_API_KEY in your environment or .env file.",
+        )
 
-    title = (data.title or "").strip()
+    def _line(obj: dict[str, Any]) -> bytes:
+        return _json_dumps(obj) + b"\n"
 
-    prompt = (
-        "You are helping an adaptive learning app label OCR text.\n"
-        "Extract (1) the single most likely learning topic, and (2) a short list of subtopics.\n\n"
-        "Return ONLY valid JSON (no markdown, no code fences) with this shape:\n"
-        '{"topic": "<short noun phrase, max 8 words>", "subtopics": ["<short phrase>", "..."]}\n\n'
-        "Rules:\n"
-        "- subtopics: 0-8 items, each max 6 words\n"
-        "- Prefer concrete concepts (e.g., 'DNA replication', 'INNER JOIN')\n"
-        "- Do not include UI/browser/app names\n\n"
-        f"Window title: {title}\n\n"
-        f"OCR text:\n{text}"
+    async def _generate():
+        try:
+            async with _gemini_sem:
+                response = await model.generate_content_async(data.prompt, stream=True)
+                async for chunk in response:
+                    text = chunk.text
+                    if text:
+                        yield _line({"delta": text})
+        except Exception as e:
+            yield _line({"error": str(e)})
+        yield _line({"done": True})
+
+    # Tell nginx-style proxies not to buffer, or the client only sees the final flush.
+    return StreamingResponse(
+        _generate(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"}
     )
 
-    def fallback_topic() -> str:
-        if title:
-            return title
-        words = [w for w in re.split(r"\s+", text) if w]
-        return " ".join(words[:8]) or "Detected topic"
 
-    def _clean_subtopics(items: Any) -> list[str]:
-        if not isinstance(items, list):
-            return []
-        out: list[str] = []
-        seen: set[str] = set()
-        for x in items:
-            if not isinstance(x, str):
-                continue
-            s = re.sub(r"\s+", " ", x).strip(" \t\r\n-•*\"")
-            if not s:
-                continue
-            key = s.lower()
-            if key in seen:
-                continue
-            seen.add(key)
-            out.append(s)
-            if len(out) >= 8:
-                break
-        return out
+_DETECT_BATCH_MAX = 20
+_JSON_ARRAY = re.compile(r"\[[\s\S]*\]")
+
+# Fixed prompt preambles, built once; only the captures are formatted in per call.
+_TOPIC_JSON_RULES = (
+    "Rules:\n"
+    "- subtopics: 0-8 items, each max 6 words\n"
+    "- Prefer concrete concepts (e.g., 'DNA replication', 'INNER JOIN')\n"
+    "- Do not include UI/browser/app names\n\n"
+)
+_TOPIC_PROMPT_HEAD = (
+    "You are helping an adaptive learning app label OCR text.\n"
+    "Extract (1) the single most likely learning topic, and (2) a short list of subtopics.\n\n"
+    "Return ONLY valid JSON (no markdown, no code fences) with this shape:\n"
+    '{"topic": "<short noun phrase, max 8 words>", "subtopics": ["<short phrase>", "..."]}\n\n'
+    + _TOPIC_JSON_RULES
+)
+_BATCH_TOPIC_PROMPT_HEAD = (
+    "You are helping an adaptive learning app label OCR text.\n"
+    "Below are {count} numbered captures. For each one, extract (1) the single most likely "
+    "learning topic, and (2) a short list of subtopics.\n\n"
+    "Return ONLY a valid JSON array (no markdown, no code fences) with exactly one object per capture, "
+    "in the same order:\n"
+    '[{{"topic": "<short noun phrase, max 8 words>", "subtopics": ["<short phrase>", "..."]}}, ...]\n\n'
+    + _TOPIC_JSON_RULES
+)
 
-    def _parse_gemini_json(raw_text: str) -> tuple[str | None, list[str] | None]:
-        candidate = (raw_text or "").strip()
-        if not candidate:
-            return None, None
 
-        # Gemini sometimes wraps JSON in markdown fences; try to extract the first JSON object.
-        if candidate.startswith("```"):
-            candidate = re.sub(r"^```[a-zA-Z]*\n", "", candidate)
-            candidate = re.sub(r"\n```$", "", candidate).strip()
+# Topic signal sits in headings and the opening lines; a full article page only adds
+# prompt tokens (latency and cost), so captures are clipped to this many characters.
+_OCR_PROMPT_BUDGET = 2000
 
-        m = re.search(r"\{[\s\S]*\}", candidate)
-        if m:
-            candidate = m.group(0).strip()
 
-        try:
-            obj = json.loads(candidate)
-        except Exception:
-            return None, None
+def _clip_ocr(text: str, budget: int = _OCR_PROMPT_BUDGET) -> str:
+    """Keep the head and tail of ``text`` when it exceeds ``budget`` characters."""
+    if len(text) <= budget:
+        return text
+    half = budget // 2
+    return f"{text[:half]}\n...\n{text[-half:]}"
+
+
+def _topic_prompt(text: str, title: str) -> str:
+    return f"{_TOPIC_PROMPT_HEAD}Window title: {title}\n\nOCR text:\n{_clip_ocr(text)}"
+
+
+def _batch_topic_prompt(items: list[tuple[str, str]]) -> str:
+    parts = [_BATCH_TOPIC_PROMPT_HEAD.format(count=len(items))]
+    for i, (text, title) in enumerate(items, 1):
+        parts.append(f"{i}) Window title: {title}\nOCR text:\n{_clip_ocr(text)}\n\n")
+    return "".join(parts).rstrip()
+
+
+def _fallback_topic(text: str, title: str) -> str:
+    if title:
+        return title
+    words = [w for w in _WS.split(text) if w]
+    return " ".join(words[:8]) or "Detected topic"
+
+
+def _clean_subtopics(items: Any) -> list[str]:
+    if not isinstance(items, list):
+        return []
+    out: list[str] = []
+    seen: set[str] = set()
+    for x in items:
+        if not isinstance(x, str):
+            continue
+        s = _WS.sub(" ", x).strip(" \t\r\n-•*\"")
+        if not s:
+            continue
+        key = s.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(s)
+        if len(out) >= 8:
+            break
+    return out
+
 
-        if not isinstance(obj, dict):
-            return None, None
+def _topic_from_obj(obj: Any) -> tuple[str | None, list[str] | None]:
+    if not isinstance(obj, dict):
+        return None, None
+    topic_val = obj.get("topic")
+    topic_str = topic_val.strip() if isinstance(topic_val, str) else None
+    return topic_str, _clean_subtopics(obj.get("subtopics"))
 
-        topic_val = obj.get("topic")
-        topic_str = topic_val.strip() if isinstance(topic_val, str) else None
-        subtopics = _clean_subtopics(obj.get("subtopics"))
-        return topic_str, subtopics
+
+def _parse_gemini_json(raw_text: str, pattern: re.Pattern[str] = _JSON_OBJECT) -> Any:
+    candidate = (raw_text or "").strip()
+    if not candidate:
+        return None
+
+    # Gemini sometimes wraps JSON in markdown fences; try to extract the first JSON value.
+    if candidate.startswith("```"):
+        candidate = _FENCE_OPEN.sub("", candidate)
+        candidate = _FENCE_CLOSE.sub("", candidate).strip()
+
+    m = pattern.search(candidate)
+    if m:
+        candidate = m.group(0).strip()
+
+    try:
+        return _json_loads(candidate)
+    except Exception:
+        return None
+
+
+async def _label_topics(items: list[tuple[str, str]]) -> list[dict[str, Any]]:
+    """Label each (text, title) capture with one Gemini call for the whole list.
+
+    Captures the model skipped or mislabelled fall back to the window title, and
+    a failed call degrades every capture to its fallback instead of raising.
+    Each result's "fallback" flag says which happened; the response models drop it.
+    """
+    def fallback(raw: str | None) -> list[dict[str, Any]]:
+        return [
+            {
+                "topic": _fallback_topic(text, title),
+                "subtopics": [],
+                "confidence": None,
+                "raw": raw,
+                "fallback": True,
+            }
+            for text, title in items
+        ]
 
     try:
-        raw = ask_gemini(prompt)
-        topic, subtopics = _parse_gemini_json(raw)
-        if not topic:
-            topic = fallback_topic()
-        if subtopics is None:
-            subtopics = []
-        return {"topic": topic, "subtopics": subtopics, "confidence": None, "raw": None}
+        # Deterministic decoding: the same screen text should map to the same topic.
+        gemini_model = get_gemini_model(temperature=0.0)
+        if len(items) == 1:
+            parsed = [_parse_gemini_json(await ask_gemini_async(_topic_prompt(*items[0]), gemini_model))]
+        else:
+            raw = await ask_gemini_async(_batch_topic_prompt(items), gemini_model)
+            parsed = _parse_gemini_json(raw, _JSON_ARRAY)
+            if not isinstance(parsed, list):
+                parsed = []
     except RuntimeError as e:
         # Missing key / AI disabled
-        return {"topic": fallback_topic(), "subtopics": [], "confidence": None, "raw": str(e)}
+        return fallback(str(e))
     except Exception as e:
         # Quota / transient errors shouldn't kill detection.
-        return {"topic": fallback_topic(), "subtopics": [], "confidence": None, "raw": str(e)}
+        return fallback(str(e))
+
+    results: list[dict[str, Any]] = []
+    for i, (text, title) in enumerate(items):
+        topic, subtopics = _topic_from_obj(parsed[i] if i < len(parsed) else None)
+        results.append({
+            "topic": topic or _fallback_topic(text, title),
+            "subtopics": subtopics or [],
+            "confidence": None,
+            "raw": None,
+            "fallback": not topic,
+        })
+    return results
+
+
+_TOPIC_CACHE_TTL_SEC = 600
+_TOPIC_CACHE_SIZE = 2048
+# Only touched from the event loop, so no lock: the async handlers never yield mid-update.
+_topic_cache: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+_topic_inflight: dict[str, asyncio.Future] = {}
+# Recent (time, simhash, label) triples: a capture within _SIMHASH_MAX_DISTANCE bits of
+# one of these is a scrolled/re-OCR'd frame of the same screen and reuses its label.
+_SIMHASH_RECENT = 64
+_SIMHASH_MAX_DISTANCE = 6
+_recent_topics: deque[tuple[float, int, dict[str, Any]]] = deque(maxlen=_SIMHASH_RECENT)
+
+
+def _topic_cache_key(text: str, title: str) -> str:
+    # Consecutive OCR frames of one window differ mostly in whitespace; normalize it away.
+    norm = _WS.sub(" ", f"{title}\x00{text}").strip().lower()
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _simhash64(text: str, n: int = 3) -> int:
+    """64-bit SimHash over word n-gram shingles; similar texts differ in few bits."""
+    words = _WS.sub(" ", text).strip().lower().split(" ")
+    shingles = [" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))]
+    bits = [
+        format(int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for sh in shingles
+    ]
+    half = len(bits) / 2
+    out = 0
+    # Column-wise majority vote, most significant bit first.
+    for column in zip(*bits):
+        out = (out << 1) | (column.count("1") > half)
+    return out
+
+
+def _near_duplicate_topic(fingerprint: int) -> dict[str, Any] | None:
+    cutoff = time.monotonic() - _TOPIC_CACHE_TTL_SEC
+    for stored_at, prior, result in reversed(_recent_topics):
+        if stored_at <= cutoff:
+            break
+        if (fingerprint ^ prior).bit_count() <= _SIMHASH_MAX_DISTANCE:
+            return result
+    return None
+
+
+def _topic_cache_get(key: str) -> dict[str, Any] | None:
+    hit = _topic_cache.get(key)
+    if hit is None:
+        return None
+    if time.monotonic() - hit[0] >= _TOPIC_CACHE_TTL_SEC:
+        del _topic_cache[key]
+        return None
+    _topic_cache.move_to_end(key)
+    return hit[1]
+
+
+def _topic_cache_put(key: str, result: dict[str, Any]) -> None:
+    _topic_cache[key] = (time.monotonic(), result)
+    _topic_cache.move_to_end(key)
+    while len(_topic_cache) > _TOPIC_CACHE_SIZE:
+        _topic_cache.popitem(last=False)
+
+
+async def _detect_topics(items: list[tuple[str, str]]) -> list[dict[str, Any]]:
+    """_label_topics with a TTL cache, coalescing concurrent requests for the same capture.
+
+    Only captures missing from the cache, not a near-duplicate of a recent capture
+    and not already being labelled by another request go to Gemini. Fallback labels
+    are returned but not cached.
+    """
+    results: list[dict[str, Any] | None] = [None] * len(items)
+    misses: dict[str, list[int]] = {}
+    fingerprints: dict[str, int] = {}
+    waiting: list[tuple[int, asyncio.Future]] = []
+    for i, item in enumerate(items):
+        key = _topic_cache_key(*item)
+        hit = _topic_cache_get(key)
+        if hit is not None:
+            results[i] = dict(hit)
+        elif key in _topic_inflight:
+            waiting.append((i, _topic_inflight[key]))
+        elif key in misses:
+            misses[key].append(i)
+        else:
+            fingerprint = _simhash64(f"{item[1]}\n{item[0]}")
+            near = _near_duplicate_topic(fingerprint)
+            if near is not None:
+                results[i] = dict(near)
+                continue
+            fingerprints[key] = fingerprint
+            misses[key] = [i]
+
+    if misses:
+        loop = asyncio.get_running_loop()
+        owned = {key: loop.create_future() for key in misses}
+        _topic_inflight.update(owned)
+        try:
+            labelled = await _label_topics([items[idx[0]] for idx in misses.values()])
+            for (key, idx), res in zip(misses.items(), labelled):
+                # Skip failed calls and captures the model left unlabelled.
+                if not res["fallback"]:
+                    _topic_cache_put(key, res)
+                    _recent_topics.append((time.monotonic(), fingerprints[key], res))
+                owned[key].set_result(res)
+                for i in idx:
+                    results[i] = dict(res)
+        finally:
+            for key, fut in owned.items():
+                _topic_inflight.pop(key, None)
+                if not fut.done():
+                    fut.set_result(None)
+
+    for i, fut in waiting:
+        res = await fut
+        # The owner was cancelled before labelling; do the work ourselves.
+        results[i] = dict(res) if res is not None else (await _label_topics([items[i]]))[0]
+    return results  # type: ignore[return-value]
+
+
+@app.post("/detect/topic", response_model=DetectTopicResponse)
+@limiter.limit(RATE_LIMIT_AI)
+async def detect_topic(request: Request, data: DetectTopicRequest):
+    text = (data.text or "").strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="text cannot be empty")
+
+    return (await _detect_topics([(text, (data.title or "").strip())]))[0]
+
+
+@app.post("/detect/topic/batch", response_model=list[DetectTopicResponse])
+@limiter.limit(RATE_LIMIT_AI)
+async def detect_topic_batch(request: Request, data: DetectTopicBatchRequest):
+    """Label several OCR captures with a single Gemini round-trip."""
+    if not data.items:
+        raise HTTPException(status_code=400, detail="items cannot be empty")
+    if len(data.items) > _DETECT_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"at most {_DETECT_BATCH_MAX} items per batch")
+
+    items: list[tuple[str, str]] = []
+    for i, item in enumerate(data.items):
+        text = (item.text or "").strip()
+        if not text:
+            raise HTTPException(status_code=400, detail=f"items[{i}].text cannot be empty")
+        items.append((text, (item.title or "").strip()))
+    return await _detect_topics(items)
 
 @app.get("/ocr/status")
 def ocr_status():
-    global _ocr_process
     exit_code = None
     pid = None
     
+    # Take one snapshot under the lock so running/exit_code can't disagree.
     with _ocr_lock:
         if _ocr_process is not None:
             exit_code = _ocr_process.poll()
             pid = _ocr_process.pid
+        running = _ocr_capturing and _ocr_process is not None and exit_code is None
     
     return {
-        "running": is_ocr_running(),
+        "running": running,
         "exit_code": exit_code,
         "pid": pid,
         "log": str(_ocr_log_path())
@@ -1197,10 +1844,7 @@ def ocr_log(lines: int = 200):
         return {"lines": []}
 
     try:
-        with path.open("r", encoding="utf-8", errors="replace") as f:
-            content = f.read().splitlines()
-        tail = content[-max(1, min(lines, 2000)) :]
-        return {"lines": tail}
+        return {"lines": _tail_lines(path, max(1, min(lines, 2000)))}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1264,22 +1908,100 @@ def _sync_topics_to_supabase(user_id: str | None, topics: list[DetectedTopic]) -
 
 @app.get("/detector/topics", response_model=list[DetectedTopic])
 def detector_topics(user_id: str | None = Depends(get_optional_user_id)):
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
+    entries, index = _read_indexed_entries()
+    topics = _build_topics_from_entries(entries, index)
     _sync_topics_to_supabase(user_id, topics)
     return topics
 
 
+# Declared before /detector/topics/{topic_id} so "summaries" is not captured as a topic id.
+@app.get("/detector/topics/summaries", response_model=TopicSummariesResponse)
+@limiter.limit(RATE_LIMIT_AI)
+def detector_topic_summaries(request: Request, ids: str = Query(..., description="Comma-separated topic ids")):
+    """Summaries for several topics at once, generated concurrently so the UI can prefetch them."""
+    topic_ids = list(dict.fromkeys(t.strip() for t in ids.split(",") if t.strip()))[:_SUMMARY_BATCH_MAX]
+    entries, index = _read_indexed_entries()
+
+    def _summary(topic_id: str) -> str | None:
+        topic_entries = _entries_for_topic(entries, index, topic_id)
+        if not topic_entries:
+            return None
+        title = _entry_topic(topic_entries[0]) or "Detected topic"
+        return get_topic_summary(topic_id, title, topic_entries)
+
+    # Bounded fan-out overlaps the Gemini round-trips without tripping its rate limits.
+    with ThreadPoolExecutor(max_workers=_SUMMARY_FANOUT) as pool:
+        summaries = dict(zip(topic_ids, pool.map(_summary, topic_ids)))
+    return TopicSummariesResponse(summaries=summaries)
+
+
 @app.get("/detector/topics/{topic_id}", response_model=DetectedTopic)
 def detector_topic(topic_id: str, user_id: str | None = Depends(get_optional_user_id)):
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
-    for t in topics:
-        if t.id == topic_id:
-            t.summary = get_topic_summary(t.id, t.title, entries)
-            _sync_topics_to_supabase(user_id, [t])
-            return t
-    raise HTTPException(status_code=404, detail="Topic not found")
+    entries, index = _read_indexed_entries()
+    t = _build_topic_by_id(topic_id, entries, index)
+    if t is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    topic_entries = _entries_for_topic(entries, index, topic_id)
+    t.summary = get_topic_summary(t.id, t.title, topic_entries, allow_stale=True)
+    _sync_topics_to_supabase(user_id, [t])
+    return t
+
+
+@app.get("/detector/topics/{topic_id}/summary/stream")
+@limiter.limit(RATE_LIMIT_AI)
+def detector_topic_summary_stream(request: Request, topic_id: str):
+    """Stream the topic summary as NDJSON ``{"delta": ...}`` lines, ending with ``{"done": true}``."""
+    entries, index = _read_indexed_entries()
+    topic_entries = _entries_for_topic(entries, index, topic_id)
+    if not topic_entries:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    topic_title = _entry_topic(topic_entries[0]) or "Detected topic"
+    captured = _build_summary_input(topic_entries)
+    data, content_hash = _summary_content_hash(captured)
+
+    def _line(obj: dict[str, Any]) -> bytes:
+        return _json_dumps(obj) + b"\n"
+
+    def _generate():
+        if not captured:
+            yield _line({"delta": "No captured content yet."})
+            yield _line({"done": True})
+            return
+
+        cache = _load_summary_cache()
+        with _summary_lock:
+            cached, is_current = _cached_summary(cache, topic_id, data, content_hash)
+        if cached is not None and is_current:
+            yield _line({"delta": cached, "cached": True})
+            yield _line({"done": True})
+            return
+
+        parts: list[str] = []
+        try:
+            gemini_model = get_gemini_model(SUMMARY_SYSTEM_PROMPT)
+            if gemini_model is None:
+                raise RuntimeError("Gemini API key not found.")
+            for chunk in gemini_model.generate_content(_summary_prompt(topic_title, captured), stream=True):
+                text = chunk.text
+                if text:
+                    parts.append(text)
+                    yield _line({"delta": text})
+        except Exception as e:
+            if parts:
+                # Keep what already reached the client; don't cache a truncated summary.
+                yield _line({"error": str(e)})
+                yield _line({"done": True})
+                return
+            fallback = _local_summary(captured)
+            parts.append(fallback)
+            yield _line({"delta": fallback})
+
+        _store_topic_summary(topic_id, content_hash, "".join(parts).strip() or "(Empty summary)")
+        yield _line({"done": True})
+
+    return StreamingResponse(
+        _generate(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/detector/topics/{topic_id}/resources", response_model=ResourcesResponse)
@@ -1289,9 +2011,7 @@ def detector_topic_resources(
     limit: int = 8,
     location: str | None = None,
 ):
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
-    topic = next((t for t in topics if t.id == topic_id), None)
+    topic = _build_topic_by_id(topic_id)
     if topic is None:
         raise HTTPException(status_code=404, detail="Topic not found")
 
@@ -1332,9 +2052,7 @@ def detector_topic_quiz(
     difficulty: str = Query("medium", regex="^(easy|medium|hard|expert|auto)$"),
     user_id: str | None = Depends(get_optional_user_id),
 ):
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
-    topic = next((t for t in topics if t.id == topic_id), None)
+    topic = _build_topic_by_id(topic_id)
     if topic is None:
         raise HTTPException(status_code=404, detail="Topic not found")
 
@@ -1411,9 +2129,7 @@ def detector_topic_explainer(
     subtopic_title: str | None = None,
     force: bool = False,
 ):
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
-    topic = next((t for t in topics if t.id == topic_id), None)
+    topic = _build_topic_by_id(topic_id)
     if topic is None:
         raise HTTPException(status_code=404, detail="Topic not found")
 
@@ -1493,9 +2209,7 @@ def detector_topic_quiz_submit(
     if not isinstance(body.answers, list) or not body.answers:
         raise HTTPException(status_code=400, detail="answers is required")
 
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
-    topic = next((t for t in topics if t.id == topic_id), None)
+    topic = _build_topic_by_id(topic_id)
     if topic is None:
         raise HTTPException(status_code=404, detail="Topic not found")
 
@@ -1642,14 +2356,7 @@ def detector_topic_graph(
             "maxDepth": int
         }
     """
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
-    
-    target_topic = None
-    for t in topics:
-        if t.id == topic_id:
-            target_topic = t
-            break
+    target_topic = _build_topic_by_id(topic_id)
     
     if not target_topic:
         raise HTTPException(status_code=404, detail="Topic not found")
@@ -1711,8 +2418,8 @@ def get_streaks(user_id: str | None = Depends(get_optional_user_id)):
 @app.get("/analytics")
 def get_analytics(user_id: str | None = Depends(get_optional_user_id)):
     """Return lightweight analytics driven by quiz mastery."""
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
+    entries, index = _read_indexed_entries()
+    topics = _build_topics_from_entries(entries, index)
 
     # Try Supabase mastery first, fall back to local file
     supabase_mastery: dict[str, dict[str, float]] = {}
@@ -1930,8 +2637,8 @@ def get_suggestions(request: Request, force: bool = False):
     global _suggestions_cache
     
     # Get current topics
-    entries = _read_output_entries()
-    topics = _build_topics_from_entries(entries)
+    entries, index = _read_indexed_entries()
+    topics = _build_topics_from_entries(entries, index)
     
     if not topics:
         return SuggestionsResponse(
@@ -2762,6 +3469,7 @@ def get_usage_stats(user_id: str = Depends(get_current_user_id)):
     llm_telemetry = get_llm_telemetry()
     return {
         "llm": llm_telemetry,
+        "caches": {"slugify": _slugify.cache_info()._asdict()},
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
 
@@ -2774,4 +3482,24 @@ async def request_id_middleware(request: Request, call_next):
     REQUEST_ID_CTX.set(request_id)
     response = await call_next(request)
     response.headers["X-Request-ID"] = request_id
-    return response
\ No newline at end of file
+    return response
+
+if __name__ == "__main__":
+    import uvicorn
+
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    if workers > 1:
+        # Each worker is its own process: the OCR worker, detector caches and rate-limit
+        # counters are per worker, so /ocr/start and /ocr/stop may land on different ones.
+        log.warning("WEB_CONCURRENCY=%d: OCR control and in-memory caches are per worker; "
+                    "use a single worker when running screen capture.", workers)
+    # "auto" picks uvloop/httptools when installed (uvicorn[standard]) and falls back to
+    # asyncio/h11 where they are unavailable, e.g. uvloop on Windows.
+    uvicorn.run(
+        "server:app",
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        loop="auto",
+        http="auto",
+    )
@@ -28,6 +28,150 @@ class TestRootEndpoint:
         assert "message" in r.json()
 
 
+class TestJsonResponses:
+    def test_matches_stdlib_encoding(self, client):
+        import json
+        from server import _ORJSONResponse
+
+        content = {"topic": "Café", "n": [1, 2.5, None, True], 3: "int key"}
+        expected = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        assert _ORJSONResponse(content).body == expected
+
+    def test_is_app_default(self, client):
+        r = client.get("/")
+        assert r.headers["content-type"] == "application/json"
+        assert r.content == b'{"message":"Adaptive Learning Agent API is running."}'
+
+
+class TestTimetableStreaming:
+    def test_stream_matches_buffered_body(self, client):
+        import json
+        from timetable.routes import TimetableResponse, _stream_timetable
+        from timetable.scheduler import TimetableScheduler
+
+        result = TimetableScheduler(
+            events=[{"subject": "Maths", "target_date": "2024-02-15", "estimated_effort_hours": 6}],
+            availability={}, preferences={},
+            topics=[{"subject": "Physics", "topic": "Kinematics", "is_concept_heavy": True}],
+            current_date="2024-02-01",
+        ).generate()
+        assert len(result["tasks"]) > 3
+
+        body = b"".join(_stream_timetable(result, "ok", chunk=3))
+        expected = TimetableResponse(success=True, data=result, message="ok").model_dump()
+        assert json.loads(body) == expected
+
+    def test_small_result_is_not_streamed(self, client):
+        r = client.post("/timetable/generate", json={"current_date": "2024-02-01", "topics": [
+            {"subject": "Physics", "topic": "Kinematics"},
+        ]})
+        assert r.status_code == 200
+        assert r.json()["success"] is True
+        assert "content-length" in r.headers
+
+
+class TestTimetableResponses:
+    @pytest.mark.parametrize("method,path", [
+        ("post", "/timetable/generate"),
+        ("get", "/timetable/sample"),
+        ("post", "/timetable/validate"),
+    ])
+    def test_schema_still_documented(self, client, method, path):
+        schema = client.app.openapi()["paths"][path][method]["responses"]["200"]
+        assert schema["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/TimetableResponse"
+        }
+
+    def test_validate_body(self, client):
+        r = client.post("/timetable/validate", json={"topics": [{"subject": "Physics", "topic": "Kinematics"}]})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/json"
+        assert r.json() == {
+            "success": True,
+            "data": {
+                "events_count": 0,
+                "topics_count": 1,
+                "weekday_hours": 4.0,
+                "weekend_hours": 6.0,
+                "session_length": 45,
+            },
+            "message": "All inputs are valid",
+        }
+
+
+class TestTimetableGenerateCache:
+    @pytest.fixture
+    def generate_calls(self, monkeypatch):
+        from timetable import routes
+
+        calls = []
+        real = routes.TimetableScheduler.generate
+
+        def counting(self):
+            calls.append(self)
+            return real(self)
+
+        monkeypatch.setattr(routes.TimetableScheduler, "generate", counting)
+        monkeypatch.setattr(routes, "_generate_cache", routes.OrderedDict())
+        return calls
+
+    BODY = {"current_date": "2024-02-01", "topics": [{"subject": "Physics", "topic": "Kinematics"}]}
+
+    def test_identical_requests_reuse_result(self, client, generate_calls):
+        first = client.post("/timetable/generate", json=self.BODY)
+        second = client.post("/timetable/generate", json=self.BODY)
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert len(generate_calls) == 1
+
+    def test_different_inputs_miss(self, client, generate_calls):
+        client.post("/timetable/generate", json=self.BODY)
+        client.post("/timetable/generate", json={**self.BODY, "current_date": "2024-02-02"})
+        assert len(generate_calls) == 2
+
+    def test_invalid_input_returns_400_and_is_not_cached(self, client, generate_calls):
+        from timetable import routes
+
+        body = {**self.BODY, "events": [{"subject": "Maths", "target_date": "not-a-date"}]}
+        r = client.post("/timetable/generate", json=body)
+        assert r.status_code == 400
+        assert r.json()["detail"]
+        assert not routes._generate_cache
+
+    def test_no_cache_regenerates(self, client, generate_calls):
+        client.post("/timetable/generate", json=self.BODY)
+        r = client.post("/timetable/generate", json={**self.BODY, "no_cache": True})
+        assert r.status_code == 200
+        assert len(generate_calls) == 2
+
+
+class TestTimetableGenerateBatch:
+    def test_results_in_order(self, client):
+        body = [
+            {"current_date": "2024-02-01", "topics": [{"subject": "Physics", "topic": "Kinematics"}]},
+            {"current_date": "2024-02-01", "events": [{"subject": "Maths", "target_date": "bad"}]},
+            {"current_date": "2024-03-01", "topics": [{"subject": "Maths", "topic": "Series"}]},
+        ]
+        r = client.post("/timetable/generate_batch", json=body)
+        assert r.status_code == 200
+        items = r.json()
+        assert [item["success"] for item in items] == [True, False, True]
+        assert items[1]["data"]["error"]
+        assert items[2]["data"]["metadata"]["generated_at"] == "2024-03-01"
+
+        single = client.post("/timetable/generate", json=body[0]).json()
+        assert items[0] == single
+
+    def test_empty_batch_returns_400(self, client):
+        assert client.post("/timetable/generate_batch", json=[]).status_code == 400
+
+    def test_oversized_batch_returns_400(self, client):
+        from timetable.routes import _GENERATE_BATCH_MAX
+
+        body = [{"current_date": "2024-02-01"}] * (_GENERATE_BATCH_MAX + 1)
+        assert client.post("/timetable/generate_batch", json=body).status_code == 400
+
+
 class TestHealthEndpoint:
     def test_health_returns_json(self, client):
         r = client.get("/health")
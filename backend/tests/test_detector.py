@@ -0,0 +1,622 @@
+"""Tests for the detector capture pipeline helpers in server.py."""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import os
+os.environ.setdefault("VITE_SUPABASE_URL", "https://placeholder.supabase.co")
+os.environ.setdefault("VITE_SUPABASE_ANON_KEY", "placeholder-key")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+import server
+
+
+def _entry(topic: str, text: str = "some text", title: str = "Chrome") -> dict:
+    return {"title": title, "ocr_text": text, "server": {"topic": topic, "subtopics": []}}
+
+
+@pytest.fixture
+def capture_log(tmp_path, monkeypatch):
+    path = tmp_path / "output.jsonl"
+    monkeypatch.setattr(server, "_output_log_path", lambda: path)
+    monkeypatch.setattr(server, "_entries_offset", 0)
+    monkeypatch.setattr(server, "_entries_accum", [])
+    monkeypatch.setattr(server, "_topic_index", {})
+    return path
+
+
+def _append(path: Path, *entries: dict, raw: str = "") -> None:
+    with path.open("a", encoding="utf-8") as f:
+        for e in entries:
+            f.write(json.dumps(e) + "\n")
+        f.write(raw)
+
+
+class TestSlugify:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("  Hello World ", "hello-world"),
+            ("C++ / Rust!!", "c-rust"),
+            ("---a--b---", "a-b"),
+            ("naïve Bayes", "na-ve-bayes"),
+            ("", "topic"),
+            ("日本語", "topic"),
+        ],
+    )
+    def test_slugify(self, value, expected):
+        assert server._slugify(value) == expected
+
+
+class TestReadOutputEntries:
+    def test_reads_only_new_lines(self, capture_log):
+        _append(capture_log, _entry("DNA"), _entry("RNA"))
+        assert [e["server"]["topic"] for e in server._read_indexed_entries()[0]] == ["DNA", "RNA"]
+
+        _append(capture_log, _entry("Proteins"))
+        entries, _ = server._read_indexed_entries()
+        assert [e["server"]["topic"] for e in entries] == ["DNA", "RNA", "Proteins"]
+        assert server._entries_offset == capture_log.stat().st_size
+
+    def test_partial_line_is_deferred(self, capture_log):
+        _append(capture_log, _entry("DNA"), raw='{"title": "half')
+        assert len(server._read_indexed_entries()[0]) == 1
+
+        _append(capture_log, raw=' written", "ocr_text": "x"}\n')
+        entries, _ = server._read_indexed_entries()
+        assert len(entries) == 2
+        assert entries[1]["title"] == "half written"
+
+    def test_skips_invalid_lines(self, capture_log):
+        _append(capture_log, _entry("DNA"), raw="not json\n[1, 2]\n\n")
+        assert len(server._read_indexed_entries()[0]) == 1
+
+    def test_truncated_log_is_reread(self, capture_log):
+        _append(capture_log, _entry("DNA"), _entry("RNA"))
+        server._read_indexed_entries()
+
+        capture_log.write_text(json.dumps(_entry("Enzymes")) + "\n", encoding="utf-8")
+        entries, _ = server._read_indexed_entries()
+        assert [e["server"]["topic"] for e in entries] == ["Enzymes"]
+
+
+class TestLegacyOutput:
+    def test_parse_is_reused_until_file_changes(self, capture_log, tmp_path, monkeypatch):
+        legacy = tmp_path / "output.json"
+        monkeypatch.setattr(server, "_legacy_output_path", lambda: legacy)
+        monkeypatch.setattr(server, "_legacy_cache", None)
+        legacy.write_text(json.dumps([_entry("DNA")]), encoding="utf-8")
+
+        first, index = server._read_indexed_entries()
+        assert index == {"dna": [0]}
+        assert server._read_indexed_entries()[0] is first
+
+        legacy.write_text(json.dumps([_entry("DNA"), _entry("RNA")]), encoding="utf-8")
+        entries, index = server._read_indexed_entries()
+        assert len(entries) == 2
+        assert index == {"dna": [0], "rna": [1]}
+
+
+class TestTopicIndex:
+    def test_index_tracks_appends(self, capture_log):
+        _append(capture_log, _entry("DNA"), _entry("RNA"), _entry("DNA", text=""))
+        entries, index = server._read_indexed_entries()
+        assert index == {"dna": [0], "rna": [1]}
+
+        _append(capture_log, _entry("DNA"), {"title": "Docs", "ocr_text": "x"})
+        entries, index = server._read_indexed_entries()
+        assert index == {"dna": [0, 3], "rna": [1], "docs": [4]}
+        assert server._entries_for_topic(entries, index, "dna") == [entries[0], entries[3]]
+        assert server._entries_for_topic(entries, index, "missing") == []
+
+    def test_index_reset_on_truncation(self, capture_log):
+        _append(capture_log, _entry("DNA"), _entry("RNA"))
+        server._read_indexed_entries()
+
+        capture_log.write_text(json.dumps(_entry("Enzymes")) + "\n", encoding="utf-8")
+        _, index = server._read_indexed_entries()
+        assert index == {"enzymes": [0]}
+
+
+class TestTailLines:
+    def test_returns_last_lines_across_blocks(self, tmp_path):
+        path = tmp_path / "ocr.log"
+        path.write_text("".join(f"line {i}\n" for i in range(100)), encoding="utf-8")
+        assert server._tail_lines(path, 3, block_size=8) == ["line 97", "line 98", "line 99"]
+
+    def test_short_file_and_missing_trailing_newline(self, tmp_path):
+        path = tmp_path / "ocr.log"
+        path.write_text("first\nsecond", encoding="utf-8")
+        assert server._tail_lines(path, 10, block_size=4) == ["first", "second"]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "ocr.log"
+        path.write_bytes(b"")
+        assert server._tail_lines(path, 5) == []
+
+
+class TestSummaryCache:
+    def test_save_replaces_file_atomically(self, tmp_path, monkeypatch):
+        path = tmp_path / "summary_cache.json"
+        monkeypatch.setattr(server, "_summary_cache_path", lambda: path)
+        path.write_text("{}", encoding="utf-8")
+
+        server._save_summary_cache({"dna": {"hash": "h", "summary": "s"}})
+
+        assert json.loads(path.read_text(encoding="utf-8")) == {"dna": {"hash": "h", "summary": "s"}}
+        assert not path.with_suffix(".json.tmp").exists()
+
+    def test_round_trip_without_orjson(self, tmp_path, monkeypatch):
+        path = tmp_path / "summary_cache.json"
+        monkeypatch.setattr(server, "_summary_cache_path", lambda: path)
+        monkeypatch.setattr(server, "_summary_cache", None)
+        monkeypatch.setattr(server, "orjson", None)
+
+        server._save_summary_cache({"dna": {"hash": "h", "summary": "Doppelhelix – ü"}})
+        assert server._load_summary_cache() == {"dna": {"hash": "h", "summary": "Doppelhelix – ü"}}
+
+
+class TestTopicSummary:
+    @pytest.fixture
+    def summaries(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(server, "_summary_cache_path", lambda: tmp_path / "summary_cache.json")
+        monkeypatch.setattr(server, "_summary_cache", {})
+        monkeypatch.setattr(server, "_summary_refreshing", set())
+        calls = []
+
+        def fake_summarize(title, captured):
+            calls.append(captured)
+            return f"summary #{len(calls)}"
+
+        monkeypatch.setattr(server, "_summarize_captured_content", fake_summarize)
+        monkeypatch.setattr(server, "_SUMMARY_FLUSH_DELAY_SEC", 60)
+        monkeypatch.setattr(server, "_summary_flush_timer", None)
+        monkeypatch.setattr(server, "_summary_flush_path", None)
+        yield calls
+        server._flush_summary_cache()
+
+    def test_unchanged_content_hits_cache(self, summaries):
+        entries = [_entry("DNA", text="double helix")]
+        assert server.get_topic_summary("dna", "DNA", entries) == "summary #1"
+        assert server.get_topic_summary("dna", "DNA", entries) == "summary #1"
+        assert len(summaries) == 1
+
+    def test_legacy_sha256_entries_still_hit(self, summaries):
+        import hashlib
+
+        entries = [_entry("DNA", text="double helix")]
+        captured = server._build_summary_input(entries)
+        legacy_hash = hashlib.sha256(captured.encode("utf-8")).hexdigest()
+        server._summary_cache["dna"] = {"hash": legacy_hash, "summary": "cached before upgrade"}
+
+        assert server.get_topic_summary("dna", "DNA", entries) == "cached before upgrade"
+        assert summaries == []
+
+    def test_cache_writes_are_coalesced(self, summaries, tmp_path):
+        path = tmp_path / "summary_cache.json"
+        server.get_topic_summary("dna", "DNA", [_entry("DNA")])
+        server.get_topic_summary("rna", "RNA", [_entry("RNA")])
+        assert not path.exists()
+
+        server._flush_summary_cache()
+        assert set(json.loads(path.read_text(encoding="utf-8"))) == {"dna", "rna"}
+        assert server._summary_flush_timer is None
+
+    def test_stale_summary_is_served_while_refreshing(self, summaries):
+        server.get_topic_summary("dna", "DNA", [_entry("DNA", text="double helix")])
+
+        entries = [_entry("DNA", text="double helix"), _entry("DNA", text="base pairs")]
+        assert server.get_topic_summary("dna", "DNA", entries, allow_stale=True) == "summary #1"
+
+        for _ in range(200):
+            if not server._summary_refreshing:
+                break
+            time.sleep(0.01)
+        assert server.get_topic_summary("dna", "DNA", entries) == "summary #2"
+
+
+class TestTopicSummariesEndpoint:
+    def test_returns_summary_per_known_id(self, capture_log, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        monkeypatch.setattr(server, "_summary_cache_path", lambda: tmp_path / "summary_cache.json")
+        monkeypatch.setattr(server, "_summary_cache", {})
+        monkeypatch.setattr(server, "_summary_refreshing", set())
+        monkeypatch.setattr(server, "_summarize_captured_content", lambda title, captured: f"about {title}")
+        monkeypatch.setattr(server, "_summary_flush_timer", None)
+        _append(capture_log, _entry("DNA"), _entry("RNA"))
+
+        r = TestClient(server.app).get("/detector/topics/summaries", params={"ids": "dna,rna,missing,dna"})
+        assert r.status_code == 200
+        assert r.json() == {"summaries": {"dna": "about DNA", "rna": "about RNA", "missing": None}}
+
+
+class TestSerpCache:
+    def test_repeat_query_is_served_from_cache(self, monkeypatch):
+        calls = []
+
+        class FakeSearch:
+            def __init__(self, params):
+                self.q = params["q"]
+                calls.append((params["q"], params.get("location")))
+
+            def get_dict(self):
+                return {"organic_results": [], "q": self.q}
+
+        monkeypatch.setattr(server, "GoogleSearch", FakeSearch)
+        monkeypatch.setenv("SERPAPI_API_KEY", "test")
+        monkeypatch.setattr(server, "_serp_cache", server.OrderedDict())
+
+        assert server._serp_search("dna")["q"] == "dna"
+        assert server._serp_search("dna")["q"] == "dna"
+        server._serp_search("dna", location="Austin")
+        assert calls == [("dna", None), ("dna", "Austin")]
+
+    def test_expired_entry_is_refetched(self, monkeypatch):
+        calls = []
+
+        class FakeSearch:
+            def __init__(self, params):
+                calls.append(params["q"])
+
+            def get_dict(self):
+                return {}
+
+        monkeypatch.setattr(server, "GoogleSearch", FakeSearch)
+        monkeypatch.setenv("SERPAPI_API_KEY", "test")
+        monkeypatch.setattr(server, "_serp_cache", server.OrderedDict())
+        monkeypatch.setattr(server, "SERP_CACHE_TTL_SEC", 0)
+
+        server._serp_search("dna")
+        server._serp_search("dna")
+        assert calls == ["dna", "dna"]
+
+
+class TestExtractSerpResources:
+    def test_filters_blocked_and_ranks_by_score(self):
+        results = {
+            "organic_results": [
+                {"title": "Python tutorial", "link": "https://docs.python.org/3/tutorial/", "snippet": "Official docs"},
+                {"title": "Ask anything", "link": "https://www.reddit.com/r/python", "snippet": "tutorial"},
+                {"title": "Random blog", "link": "https://example.com/post", "snippet": "thoughts"},
+                {"title": "Biology", "link": "https://WWW.Nature.com/articles/x", "snippet": "reference guide"},
+            ],
+            "inline_videos": [{"title": "Crash course", "link": "https://youtu.be/x", "channel": "CS50"}],
+        }
+        items = server._extract_serp_resources(results, query="python", limit=8)
+
+        assert [i.source for i in items] == ["docs.python.org", "nature.com", "CS50"]
+        assert [i.type for i in items] == ["docs", "article", "video"]
+        assert items == sorted(items, key=lambda i: i.score, reverse=True)
+
+    def test_limit_is_applied(self):
+        results = {
+            "organic_results": [
+                {"title": f"Docs {i}", "link": f"https://docs.python.org/{i}", "snippet": ""} for i in range(5)
+            ]
+        }
+        items = server._extract_serp_resources(results, query="python", limit=2)
+        assert [i.url for i in items] == ["https://docs.python.org/0", "https://docs.python.org/1"]
+
+
+class TestTopicSummaryStream:
+    @pytest.fixture
+    def client(self, capture_log, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        monkeypatch.setattr(server, "_summary_cache_path", lambda: tmp_path / "summary_cache.json")
+        monkeypatch.setattr(server, "_summary_cache", {})
+        monkeypatch.setattr(server, "_SUMMARY_FLUSH_DELAY_SEC", 60)
+        monkeypatch.setattr(server, "_summary_flush_timer", None)
+        _append(capture_log, _entry("DNA", text="double helix"))
+        yield TestClient(server.app)
+        server._flush_summary_cache()
+
+    @staticmethod
+    def _lines(r):
+        return [json.loads(line) for line in r.text.splitlines()]
+
+    def test_streams_chunks_and_caches_result(self, client, monkeypatch):
+        import types
+
+        class FakeModel:
+            def generate_content(self, prompt, stream=False):
+                assert stream
+                return [types.SimpleNamespace(text="- DNA "), types.SimpleNamespace(text="is a helix")]
+
+        monkeypatch.setattr(server, "get_gemini_model", lambda *a, **k: FakeModel())
+
+        r = client.get("/detector/topics/dna/summary/stream")
+        assert r.status_code == 200
+        assert self._lines(r) == [{"delta": "- DNA "}, {"delta": "is a helix"}, {"done": True}]
+        assert server._summary_cache["dna"]["summary"] == "- DNA is a helix"
+
+        r = client.get("/detector/topics/dna/summary/stream")
+        assert self._lines(r) == [{"delta": "- DNA is a helix", "cached": True}, {"done": True}]
+
+    def test_unknown_topic_is_404(self, client):
+        assert client.get("/detector/topics/missing/summary/stream").status_code == 404
+
+
+@pytest.fixture
+def topic_cache(monkeypatch):
+    monkeypatch.setattr(server, "_topic_cache", server.OrderedDict())
+    monkeypatch.setattr(server, "_topic_inflight", {})
+    monkeypatch.setattr(server, "_recent_topics", server.deque(maxlen=server._SIMHASH_RECENT))
+    return server._topic_cache
+
+
+class TestClipOcr:
+    def test_short_text_untouched(self):
+        assert server._clip_ocr("abc", budget=10) == "abc"
+
+    def test_keeps_head_and_tail(self):
+        text = "H" * 50 + "m" * 100 + "T" * 50
+        assert server._clip_ocr(text, budget=100) == "H" * 50 + "\n...\n" + "T" * 50
+
+    def test_prompt_uses_clipped_text(self):
+        prompt = server._topic_prompt("x" * 10_000, "Title")
+        assert len(prompt) < len(server._TOPIC_PROMPT_HEAD) + server._OCR_PROMPT_BUDGET + 100
+
+
+class TestDetectTopicBatch:
+    @pytest.fixture
+    def prompts(self, monkeypatch, topic_cache):
+        sent: list[str] = []
+
+        async def fake_ask(prompt, gemini_model=None):
+            sent.append(prompt)
+            return '```json\n[{"topic": "DNA replication", "subtopics": ["Helicase", "helicase", " Primase "]}]\n```'
+
+        monkeypatch.setattr(server, "get_gemini_model", lambda *a, **k: None)
+        monkeypatch.setattr(server, "ask_gemini_async", fake_ask)
+        return sent
+
+    def test_one_call_for_the_whole_batch(self, prompts):
+        out = asyncio.run(server._detect_topics([("helicase unwinds DNA", "Biology"), ("SELECT * FROM t", "")]))
+        assert len(prompts) == 1
+        assert "1) Window title: Biology" in prompts[0] and "2) Window title: " in prompts[0]
+        assert out[0]["topic"] == "DNA replication"
+        assert out[0]["subtopics"] == ["Helicase", "Primase"]
+        # Missing entries in the model's array fall back to the capture itself.
+        assert out[1]["topic"] == "SELECT * FROM t"
+
+    def test_label_matching_title_is_cached(self, monkeypatch, topic_cache):
+        async def fake_ask(prompt, gemini_model=None):
+            return '{"topic": "Photosynthesis", "subtopics": []}'
+
+        monkeypatch.setattr(server, "get_gemini_model", lambda *a, **k: None)
+        monkeypatch.setattr(server, "ask_gemini_async", fake_ask)
+        out = asyncio.run(server._detect_topics([("light reactions", "Photosynthesis")]))
+        assert out[0]["topic"] == "Photosynthesis" and out[0]["fallback"] is False
+        assert len(topic_cache) == 1
+
+    def test_unlabelled_item_is_not_cached(self, prompts, topic_cache):
+        out = asyncio.run(server._detect_topics([("helicase unwinds DNA", "Biology"), ("SELECT * FROM t", "")]))
+        assert [o["fallback"] for o in out] == [False, True]
+        assert len(topic_cache) == 1
+
+    def test_failed_call_falls_back_per_item(self, monkeypatch, topic_cache):
+        async def boom(prompt, gemini_model=None):
+            raise RuntimeError("no key")
+
+        monkeypatch.setattr(server, "get_gemini_model", lambda *a, **k: None)
+        monkeypatch.setattr(server, "ask_gemini_async", boom)
+        out = asyncio.run(server._detect_topics([("a b c", "Title"), ("x y", "")]))
+        assert [o["topic"] for o in out] == ["Title", "x y"]
+        assert all(o["raw"] == "no key" for o in out)
+        assert topic_cache == {}
+
+    def test_ask_gemini_async_bounds_concurrency(self, monkeypatch):
+        import types
+
+        in_flight = peak = 0
+
+        class FakeModel:
+            async def generate_content_async(self, prompt):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return types.SimpleNamespace(text=prompt.upper())
+
+        async def run():
+            monkeypatch.setattr(server, "_gemini_sem", asyncio.Semaphore(2))
+            return await asyncio.gather(*(server.ask_gemini_async(p, FakeModel()) for p in "abcde"))
+
+        assert asyncio.run(run()) == list("ABCDE")
+        assert peak == 2
+
+    def test_endpoint_validates_items(self, prompts):
+        from fastapi.testclient import TestClient
+
+        client = TestClient(server.app)
+        assert client.post("/detect/topic/batch", json={"items": []}).status_code == 400
+        r = client.post("/detect/topic/batch", json={"items": [{"text": "ok"}, {"text": "  "}]})
+        assert r.status_code == 400 and "items[1]" in r.json()["detail"]
+        assert prompts == []
+
+
+class TestDetectTopicCache:
+    @pytest.fixture
+    def calls(self, monkeypatch, topic_cache):
+        calls: list[list[tuple[str, str]]] = []
+
+        async def fake_label(items):
+            calls.append(list(items))
+            await asyncio.sleep(0.01)
+            return [
+                {"topic": f"T:{text}", "subtopics": [], "confidence": None, "raw": None, "fallback": False}
+                for text, _ in items
+            ]
+
+        monkeypatch.setattr(server, "_label_topics", fake_label)
+        return calls
+
+    def test_whitespace_and_case_variants_hit(self, calls):
+        first = asyncio.run(server._detect_topics([("Cell  Biology\n", "Notes")]))
+        again = asyncio.run(server._detect_topics([("cell biology", "notes")]))
+        assert len(calls) == 1
+        assert again == first
+
+    def test_batch_only_labels_misses(self, calls):
+        asyncio.run(server._detect_topics([("a", "")]))
+        out = asyncio.run(server._detect_topics([("a", ""), ("b", ""), ("b", "")]))
+        assert calls == [[("a", "")], [("b", "")]]
+        assert [o["topic"] for o in out] == ["T:a", "T:b", "T:b"]
+
+    def test_concurrent_identical_requests_coalesce(self, calls):
+        async def run():
+            return await asyncio.gather(*(server._detect_topics([("same", "w")]) for _ in range(5)))
+
+        out = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(o == out[0] for o in out)
+
+    def test_expired_entries_are_relabelled(self, calls, monkeypatch):
+        asyncio.run(server._detect_topics([("x", "")]))
+        monkeypatch.setattr(server, "_TOPIC_CACHE_TTL_SEC", 0)
+        asyncio.run(server._detect_topics([("x", "")]))
+        assert len(calls) == 2
+
+    def test_near_duplicate_frame_reuses_label(self, calls):
+        words = [f"term{i}" for i in range(200)]
+        asyncio.run(server._detect_topics([(" ".join(words), "Notes")]))
+        # Scrolled by a couple of lines: same screen, slightly different OCR text.
+        scrolled = " ".join(words[4:] + ["new", "line", "of", "text"])
+        out = asyncio.run(server._detect_topics([(scrolled, "Notes")]))
+        assert len(calls) == 1
+        assert out[0]["topic"] == "T:" + " ".join(words)
+
+        asyncio.run(server._detect_topics([(" ".join(f"other{i}" for i in range(200)), "Notes")]))
+        assert len(calls) == 2
+
+
+class TestSimhash:
+    def test_distance_tracks_similarity(self):
+        words = [f"w{i}" for i in range(300)]
+        base = server._simhash64(" ".join(words))
+        near = server._simhash64(" ".join(words[5:] + ["x", "y", "z", "u", "v"]))
+        far = server._simhash64(" ".join(f"z{i}" for i in range(300)))
+        assert (base ^ near).bit_count() <= server._SIMHASH_MAX_DISTANCE
+        assert (base ^ far).bit_count() > server._SIMHASH_MAX_DISTANCE
+
+    def test_whitespace_and_case_insensitive(self):
+        assert server._simhash64("Hello  World\nagain") == server._simhash64("hello world again")
+        assert 0 <= server._simhash64("x") < 1 << 64
+
+
+class TestOcrWorker:
+    @pytest.fixture
+    def worker(self, tmp_path, monkeypatch):
+        # Stand-in for ocr.py --worker: records each control line it receives.
+        script = tmp_path / "ocr.py"
+        received = tmp_path / "commands.txt"
+        script.write_text(
+            "import sys\n"
+            f"with open({str(received)!r}, 'a') as out:\n"
+            "    for line in sys.stdin:\n"
+            "        out.write(line)\n"
+            "        out.flush()\n"
+        )
+        monkeypatch.setattr(server, "_OCR_SCRIPT_PATH", script)
+        monkeypatch.setattr(server, "_ocr_log_path", lambda: tmp_path / "ocr.log")
+        monkeypatch.setattr(server, "_ocr_process", None)
+        monkeypatch.setattr(server, "_ocr_capturing", False)
+        yield received
+        server._shutdown_ocr_worker()
+
+    @staticmethod
+    def _wait_for(path: Path, text: str) -> str:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if path.exists() and path.read_text() == text:
+                break
+            time.sleep(0.02)
+        return path.read_text()
+
+    def test_one_worker_serves_every_session(self, worker):
+        assert server.start_ocr() is True
+        pid = server._ocr_process.pid
+        assert server.start_ocr() is False
+        assert server.is_ocr_running()
+
+        assert server.stop_ocr() is True
+        assert not server.is_ocr_running()
+        assert server.stop_ocr() is False
+
+        assert server.start_ocr() is True
+        assert server._ocr_process.pid == pid
+        assert self._wait_for(worker, "START\nSTOP\nSTART\n") == "START\nSTOP\nSTART\n"
+
+    def test_crashed_session_is_not_reported_running(self, worker):
+        # ocr.py --worker exits non-zero when capture_loop raises.
+        server._OCR_SCRIPT_PATH.write_text(
+            "import sys\n"
+            "for line in sys.stdin:\n"
+            "    if line.strip() == 'START':\n"
+            "        sys.exit(1)\n"
+        )
+        assert server.start_ocr() is True
+        proc = server._ocr_process
+        proc.wait(timeout=5)
+
+        assert not server.is_ocr_running()
+        status = server.ocr_status()
+        assert status["running"] is False
+        assert status["exit_code"] == 1
+
+        assert server.start_ocr() is True
+        assert server._ocr_process is not proc
+
+    def test_shutdown_closes_worker(self, worker):
+        server.start_ocr()
+        proc = server._ocr_process
+        server._shutdown_ocr_worker()
+        assert proc.poll() == 0
+        assert server._ocr_process is None
+
+
+class TestAskStream:
+    def test_streams_deltas(self, monkeypatch):
+        import types
+        from fastapi.testclient import TestClient
+
+        class FakeStream:
+            def __init__(self, parts):
+                self._parts = iter(parts)
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return types.SimpleNamespace(text=next(self._parts))
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        class FakeModel:
+            async def generate_content_async(self, prompt, stream=False):
+                assert stream
+                return FakeStream(["Hel", "", "lo"])
+
+        monkeypatch.setattr(server, "model", FakeModel())
+        r = TestClient(server.app).post("/ask/stream", json={"prompt": "hi"})
+        assert r.status_code == 200
+        assert r.headers["x-accel-buffering"] == "no"
+        lines = [json.loads(line) for line in r.text.splitlines()]
+        assert lines == [{"delta": "Hel"}, {"delta": "lo"}, {"done": True}]
+
+    def test_requires_key(self, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        monkeypatch.setattr(server, "model", None)
+        assert TestClient(server.app).post("/ask/stream", json={"prompt": "hi"}).status_code == 503
@@ -0,0 +1,58 @@
+"""Tests for the Hugging Face zero-shot text classifier."""
+
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import os
+os.environ.setdefault("HF_TOKEN", "placeholder-token")
+
+import text_detection
+
+
+def _result(top: str) -> dict:
+    labels = [top] + [l for l in text_detection.LABELS if l != top]
+    return {"labels": labels, "scores": [0.6] + [0.08] * (len(labels) - 1)}
+
+
+@pytest.fixture
+def router(monkeypatch):
+    payloads: list[dict] = []
+    response: dict = {}
+
+    def fake_query(payload):
+        payloads.append(payload)
+        return response["output"]
+
+    monkeypatch.setattr(text_detection, "query", fake_query)
+    return payloads, response
+
+
+class TestDetectTextClassificationBatch:
+    def test_list_output_maps_in_order(self, router):
+        payloads, response = router
+        response["output"] = [_result("entertainment"), _result("educational content"), _result("other")]
+        out = text_detection.detect_text_classification_batch(["a", "b", "c"])
+        assert out == [False, True, False]
+        assert payloads == [{"inputs": ["a", "b", "c"], "parameters": {"candidate_labels": text_detection.LABELS}}]
+
+    def test_single_dict_is_wrapped(self, router):
+        _, response = router
+        response["output"] = _result("educational content")
+        assert text_detection.detect_text_classification_batch(["only"]) == [True]
+
+    def test_error_payload_is_all_false(self, router):
+        _, response = router
+        response["output"] = {"error": "Model is loading"}
+        assert text_detection.detect_text_classification_batch(["a", "b"]) == [False, False]
+
+    def test_wrong_length_is_all_false(self, router):
+        _, response = router
+        response["output"] = [_result("educational content")]
+        assert text_detection.detect_text_classification_batch(["a", "b", "c"]) == [False, False, False]
+
+    def test_empty_input_skips_the_call(self, router):
+        payloads, _ = router
+        assert text_detection.detect_text_classification_batch([]) == []
+        assert payloads == []
@@ -1,30 +1,57 @@
+import atexit
+import logging
 import os
 import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
 
 API_URL = "https://router.huggingface.co/hf-inference/models/facebook/bart-large-mnli"
 headers = {
     "Authorization": f"Bearer {os.environ['HF_TOKEN']}",
 }
 
+# One keep-alive session for every call, so only the first request pays the TCP/TLS handshake.
+_hf_session = requests.Session()
+_hf_session.headers.update(headers)
+_hf_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+atexit.register(_hf_session.close)
+
 def query(payload):
-    response = requests.post(API_URL, headers=headers, json=payload)
+    response = _hf_session.post(API_URL, json=payload, timeout=30)
     return response.json()
 
+LABELS = ["educational content", "personal data",
+    "credentials", "sensitive information", "entertainment", "other"]
+
 def detect_text_classification(text):
     output = query({
         "inputs": text,
-        "parameters": {"candidate_labels": ["educational content","personal data",
-            "credentials","sensitive information","entertainment","other"]},
+        "parameters": {"candidate_labels": LABELS},
     })
 
-    print(output)
-    labels = output.get("labels", [])
-    scores = output.get("scores", [])
+    log.debug("hf response: %s", output)
+    return _is_educational(output)
+
 
+def _is_educational(output):
+    labels = output.get("labels", []) if isinstance(output, dict) else []
+    scores = output.get("scores", []) if isinstance(output, dict) else []
     if not labels or not scores:
         return False
+    return labels[scores.index(max(scores))] == "educational content"
 
-    max_index = scores.index(max(scores))
-    top_label = labels[max_index]
-
-    return top_label == "educational content"
\ No newline at end of file
+def detect_text_classification_batch(texts):
+    """Classify several texts in one router call; returns one bool per text, in order."""
+    if not texts:
+        return []
+    output = query({
+        "inputs": list(texts),
+        "parameters": {"candidate_labels": LABELS},
+    })
+    if isinstance(output, dict):
+        # A single input (or an error payload) comes back as one object, not a list.
+        output = [output]
+    if not isinstance(output, list) or len(output) != len(texts):
+        return [False] * len(texts)
+    return [_is_educational(o) for o in output]
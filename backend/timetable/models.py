@@ -6,7 +6,7 @@ All models are immutable-friendly and serializable.
 """
 
 from dataclasses import dataclass, field
-from datetime import date, time, datetime
+from datetime import date, time, datetime, timedelta
 from enum import Enum
 from typing import Optional
 
@@ -38,7 +38,13 @@ class TaskType(str, Enum):
     EXAM_PREP = "exam_prep"
 
 
-@dataclass(frozen=True)
+# Enum.value goes through a descriptor on every access; the to_dict methods
+# serialize one value per slot/task, so they look the strings up here instead.
+_TASK_STATUS_VALUE = {member: member.value for member in TaskStatus}
+_TASK_TYPE_VALUE = {member: member.value for member in TaskType}
+
+
+@dataclass(frozen=True, slots=True)
 class FixedEvent:
     """
     Represents a fixed event like an exam, assignment, or deadline.
@@ -70,7 +76,7 @@ class FixedEvent:
             raise ValueError("estimated_effort_hours cannot be negative")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DailyAvailability:
     """
     Defines available study hours per day type.
@@ -86,7 +92,12 @@ class DailyAvailability:
     weekend_hours: float = 6.0
     start_time: time = field(default_factory=lambda: time(9, 0))
     end_time: time = field(default_factory=lambda: time(21, 0))
-    excluded_dates: tuple[date, ...] = field(default_factory=tuple)
+    excluded_dates: frozenset[date] = field(default_factory=frozenset)
+    
+    def __post_init__(self):
+        """Store excluded dates as a frozenset so each lookup is O(1)."""
+        if not isinstance(self.excluded_dates, frozenset):
+            object.__setattr__(self, "excluded_dates", frozenset(self.excluded_dates))
     
     def get_hours_for_date(self, target_date: date) -> float:
         """Get available hours for a specific date."""
@@ -96,9 +107,29 @@ class DailyAvailability:
         if target_date.weekday() < 5:
             return self.weekday_hours
         return self.weekend_hours
+    
+    def hours_array(self, start_date: date, end_date: date) -> list[float]:
+        """
+        Get available hours for every date from start_date to end_date (inclusive).
+        
+        Equivalent to calling get_hours_for_date per day, but resolves the
+        weekday/weekend split from the weekday of start_date instead of per date.
+        """
+        excluded = self.excluded_dates
+        weekday_hours, weekend_hours = self.weekday_hours, self.weekend_hours
+        first_weekday = start_date.weekday()
+        hours = []
+        for offset in range((end_date - start_date).days + 1):
+            if excluded and start_date + timedelta(days=offset) in excluded:
+                hours.append(0.0)
+            elif (first_weekday + offset) % 7 < 5:
+                hours.append(weekday_hours)
+            else:
+                hours.append(weekend_hours)
+        return hours
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StudyPreferences:
     """
     User preferences for study sessions.
@@ -130,7 +161,7 @@ class StudyPreferences:
             raise ValueError("buffer_percentage should be between 0.1 and 0.3")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LearningTopic:
     """
     Represents a detected learning topic from the adaptive learning system.
@@ -162,12 +193,13 @@ class LearningTopic:
             raise ValueError("confidence_score must be between 0 and 1")
 
 
-@dataclass
+@dataclass(slots=True)
 class StudyTask:
     """
     An atomic study task that fits into one study session.
     
-    This is a mutable class as task status changes during scheduling.
+    This is a mutable class as task status changes during scheduling. Like the
+    other mutable models it uses __slots__, since the scheduler creates them in bulk.
     
     Attributes:
         task_id: Unique identifier
@@ -237,7 +269,7 @@ class StudyTask:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TimeSlot:
     """
     A scheduled time slot in the timetable.
@@ -250,6 +282,7 @@ class TimeSlot:
         task_id: ID of the scheduled task
         task_type: Type of study task
         is_break: Whether this is a break slot
+        duration_minutes: Slot length in minutes, derived from start/end time
     """
     start_time: time
     end_time: time
@@ -258,6 +291,13 @@ class TimeSlot:
     task_id: str
     task_type: TaskType = TaskType.INITIAL_LEARNING
     is_break: bool = False
+    duration_minutes: int = field(init=False, repr=False, compare=False, default=0)
+    
+    def __post_init__(self):
+        """Compute the duration once; the slot is frozen, so it can never go stale."""
+        start_minutes = self.start_time.hour * 60 + self.start_time.minute
+        end_minutes = self.end_time.hour * 60 + self.end_time.minute
+        object.__setattr__(self, "duration_minutes", end_minutes - start_minutes)
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -267,12 +307,12 @@ class TimeSlot:
             "subject": self.subject,
             "topic": self.topic,
             "task_id": self.task_id,
-            "task_type": self.task_type.value,
+            "task_type": _TASK_TYPE_VALUE[self.task_type],
             "is_break": self.is_break,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class DaySchedule:
     """
     Schedule for a single day.
@@ -283,26 +323,26 @@ class DaySchedule:
         total_study_minutes: Total study time scheduled
         subjects_covered: Set of subjects covered this day
         capacity_used: Percentage of daily capacity used
+        session_count: Number of study (non-break) slots, maintained by add_slot
     """
     date: date
     slots: list[TimeSlot] = field(default_factory=list)
     total_study_minutes: int = 0
     subjects_covered: set[str] = field(default_factory=set)
     capacity_used: float = 0.0
+    session_count: int = 0
     
     def add_slot(self, slot: TimeSlot) -> None:
         """Add a time slot to the day."""
         self.slots.append(slot)
         if not slot.is_break:
-            # Calculate minutes from time objects
-            start_minutes = slot.start_time.hour * 60 + slot.start_time.minute
-            end_minutes = slot.end_time.hour * 60 + slot.end_time.minute
-            self.total_study_minutes += end_minutes - start_minutes
+            self.total_study_minutes += slot.duration_minutes
             self.subjects_covered.add(slot.subject)
+            self.session_count += 1
     
     def get_session_count(self) -> int:
         """Get number of study sessions (excluding breaks)."""
-        return len([s for s in self.slots if not s.is_break])
+        return self.session_count
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -316,7 +356,7 @@ class DaySchedule:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CapacityWarning:
     """
     Warning about capacity issues during scheduling.
@@ -342,7 +382,7 @@ class CapacityWarning:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TimetableOutput:
     """
     Complete timetable output.
@@ -360,6 +400,15 @@ class TimetableOutput:
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
+        # Tasks share a handful of deadlines and scheduled dates, so format each date once.
+        iso_dates: dict[date, str] = {}
+        
+        def isoformat(d: date) -> str:
+            text = iso_dates.get(d)
+            if text is None:
+                text = iso_dates[d] = d.isoformat()
+            return text
+        
         return {
             "schedule": {
                 date_str: day.to_dict() 
@@ -370,15 +419,15 @@ class TimetableOutput:
                     "task_id": t.task_id,
                     "subject": t.subject,
                     "topic": t.topic,
-                    "deadline": t.deadline.isoformat(),
+                    "deadline": isoformat(t.deadline),
                     "required_minutes": t.required_minutes,
                     "priority": t.priority,
                     "difficulty_score": t.difficulty_score,
                     "confidence_score": t.confidence_score,
-                    "status": t.status.value,
-                    "task_type": t.task_type.value,
+                    "status": _TASK_STATUS_VALUE[t.status],
+                    "task_type": _TASK_TYPE_VALUE[t.task_type],
                     "parent_task_id": t.parent_task_id,
-                    "scheduled_date": t.scheduled_date.isoformat() if t.scheduled_date else None,
+                    "scheduled_date": isoformat(t.scheduled_date) if t.scheduled_date else None,
                 }
                 for t in self.tasks
             ],
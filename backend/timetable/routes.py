@@ -4,14 +4,27 @@ FastAPI Router for Timetable Generation
 REST API endpoints for the timetable generation module.
 """
 
-from datetime import date
-from typing import Optional
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Iterator, Optional
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 
-from .scheduler import TimetableScheduler, handle_missed_session, update_confidence
+from .scheduler import InputNormalizer, TimetableScheduler, handle_missed_session, update_confidence
 from .models import TimetableOutput
 
+try:
+    import orjson
+except ImportError:  # optional accelerator; stdlib json is used otherwise
+    orjson = None
+
 
 # ============================================================================
 # Pydantic Request/Response Models
@@ -67,6 +80,7 @@ class GenerateTimetableRequest(BaseModel):
     preferences: StudyPreferencesInput = Field(default_factory=StudyPreferencesInput)
     topics: list[LearningTopicInput] = Field(default_factory=list, description="Learning topics")
     current_date: Optional[str] = Field(default=None, description="Start date (defaults to today)")
+    no_cache: bool = Field(default=False, description="Always regenerate instead of reusing a cached result")
 
     model_config = {
         "json_schema_extra": {
@@ -120,78 +134,271 @@ class UpdateConfidenceRequest(BaseModel):
 
 
 class TimetableResponse(BaseModel):
-    """Response model for generated timetable."""
+    """
+    Response model for generated timetable.
+    
+    Routes build it with model_construct(): `data` is produced by the scheduler
+    itself, so validating (and copying) the whole timetable again is wasted work.
+    For the same reason the routes return it already encoded (see _encode) and
+    only reference it in `responses=` for the OpenAPI schema.
+    """
     success: bool
     data: dict
     message: str = ""
 
 
+def _scheduler_inputs(request: GenerateTimetableRequest) -> dict:
+    """
+    Raw scheduler inputs for a request.
+    
+    The input models are flat, so each one's field dict already has the shape
+    InputNormalizer reads; using it directly skips a recursive model_dump() per
+    event and topic. The normalizer only reads these dicts, never mutates them.
+    """
+    return {
+        "events": [e.__dict__ for e in request.events],
+        "availability": request.availability.__dict__,
+        "preferences": request.preferences.__dict__,
+        "topics": [t.__dict__ for t in request.topics],
+    }
+
+
+# Identical /generate requests (UI retries, prefetch) reuse the last result for a while.
+_GENERATE_CACHE_TTL_SEC = 300
+_GENERATE_CACHE_SIZE = 256
+_generate_cache_lock = threading.Lock()
+# request hash -> (generated_at, scheduler result), oldest first.
+_generate_cache: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+
+def _generate_cache_key(request: GenerateTimetableRequest) -> bytes:
+    """Hash of everything the schedule depends on, with the start date resolved."""
+    body = request.model_dump_json(exclude={"no_cache"})
+    start = request.current_date or date.today().isoformat()
+    return hashlib.blake2b(f"{start}\x00{body}".encode(), digest_size=16).digest()
+
+
+def _generate_cached(request: GenerateTimetableRequest) -> tuple[bool, dict | str]:
+    """
+    Run the scheduler for a request, reusing a recent result for the same inputs.
+    
+    Returns TimetableScheduler.generate_safe()'s (ok, result or error) pair;
+    only successful results are cached.
+    """
+    key = None if request.no_cache else _generate_cache_key(request)
+    if key is not None:
+        with _generate_cache_lock:
+            hit = _generate_cache.get(key)
+            if hit is not None and time.monotonic() - hit[0] < _GENERATE_CACHE_TTL_SEC:
+                _generate_cache.move_to_end(key)
+                return True, hit[1]
+    
+    ok, result = TimetableScheduler.generate_safe(
+        **_scheduler_inputs(request),
+        current_date=request.current_date,
+    )
+    
+    # Results are only serialized, never mutated, so cache hits can share them.
+    if ok and key is not None:
+        with _generate_cache_lock:
+            _generate_cache[key] = (time.monotonic(), result)
+            _generate_cache.move_to_end(key)
+            while len(_generate_cache) > _GENERATE_CACHE_SIZE:
+                _generate_cache.popitem(last=False)
+    return ok, result
+
+
+# Results with more tasks than this are streamed, this many tasks/days per chunk.
+_STREAM_CHUNK = 256
+
+
+def _dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, encoded the same way as the app's default response class."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _response_body(response: TimetableResponse) -> dict:
+    return {
+        "success": response.success,
+        "data": response.data,
+        "message": response.message,
+    }
+
+
+def _encode(response: TimetableResponse) -> bytes:
+    """Encode a TimetableResponse without another validation or serialization pass."""
+    return _dumps(_response_body(response))
+
+
+def _json_response(response: TimetableResponse) -> Response:
+    return Response(_encode(response), media_type="application/json")
+
+
+def _stream_timetable(result: dict, message: str, chunk: int = _STREAM_CHUNK) -> Iterator[bytes]:
+    """
+    Yield a successful TimetableResponse body in pieces.
+    
+    The bytes joined together are the same document the buffered response
+    would send, but the schedule and task lists are encoded `chunk` entries at
+    a time so the first bytes go out before the whole body has been built.
+    """
+    yield b'{"success":true,"data":{"schedule":{'
+    days = list(result["schedule"].items())
+    for i in range(0, len(days), chunk):
+        piece = _dumps(dict(days[i:i + chunk]))[1:-1]
+        yield piece if i == 0 else b"," + piece
+    yield b'},"tasks":['
+    tasks = result["tasks"]
+    for i in range(0, len(tasks), chunk):
+        piece = _dumps(tasks[i:i + chunk])[1:-1]
+        yield piece if i == 0 else b"," + piece
+    yield b'],"warnings":' + _dumps(result["warnings"])
+    yield b',"metadata":' + _dumps(result["metadata"])
+    yield b'},"message":' + _dumps(message) + b"}"
+
+
 # ============================================================================
 # FastAPI Router
 # ============================================================================
 
 router = APIRouter(prefix="/timetable", tags=["Timetable"])
 
+# Routes return encoded responses; the model is only used to document them.
+_DOCUMENTED_RESPONSE = {200: {"model": TimetableResponse}}
+
 
-@router.post("/generate", response_model=TimetableResponse)
-async def generate_timetable(request: GenerateTimetableRequest) -> TimetableResponse:
+def _generated_message(result: dict) -> str:
+    """Response message for a generated timetable, mentioning any warnings."""
+    warnings_count = len(result.get("warnings", []))
+    if warnings_count > 0:
+        return f"Timetable generated with {warnings_count} warning(s)"
+    return "Timetable generated successfully"
+
+
+@router.post("/generate", response_model=None, responses=_DOCUMENTED_RESPONSE)
+def generate_timetable(request: GenerateTimetableRequest) -> Response:
     """
     Generate a study timetable.
     
     Takes events, availability, preferences, and topics as input.
-    Returns a deterministic, constraint-based schedule.
+    Returns a deterministic, constraint-based schedule. Large schedules are
+    streamed in chunks; the body is the same TimetableResponse JSON.
     """
-    try:
-        # Convert Pydantic models to dicts
-        events = [e.model_dump() for e in request.events]
-        availability = request.availability.model_dump()
-        preferences = request.preferences.model_dump()
-        topics = [t.model_dump() for t in request.topics]
-        
-        # Generate timetable
-        scheduler = TimetableScheduler(
-            events=events,
-            availability=availability,
-            preferences=preferences,
-            topics=topics,
-            current_date=request.current_date,
-        )
-        
-        result = scheduler.generate()
-        
-        # Check for warnings
-        warnings_count = len(result.get("warnings", []))
-        message = "Timetable generated successfully"
-        if warnings_count > 0:
-            message = f"Timetable generated with {warnings_count} warning(s)"
-        
-        return TimetableResponse(
-            success=True,
-            data=result,
-            message=message,
+    # Generate timetable (or reuse the result for an identical recent request).
+    # Invalid input comes back as (False, message); anything else is left to
+    # the app's exception handler.
+    ok, result = _generate_cached(request)
+    if not ok:
+        raise HTTPException(status_code=400, detail=result)
+    
+    message = _generated_message(result)
+    
+    if len(result["tasks"]) > _STREAM_CHUNK:
+        return StreamingResponse(
+            _stream_timetable(result, message),
+            media_type="application/json",
         )
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate timetable: {str(e)}")
+    
+    return _json_response(TimetableResponse.model_construct(
+        success=True,
+        data=result,
+        message=message,
+    ))
 
 
-@router.get("/sample", response_model=TimetableResponse)
-async def get_sample_timetable() -> TimetableResponse:
+_GENERATE_BATCH_MAX = 20
+
+
+@router.post(
+    "/generate_batch",
+    response_model=None,
+    responses={200: {"model": list[TimetableResponse]}},
+)
+def generate_timetable_batch(batch: list[GenerateTimetableRequest]) -> Response:
     """
-    Generate a sample timetable for demonstration.
+    Generate several timetables in one call.
     
-    Uses predefined sample data to show the system's capabilities.
+    Each entry is handled like /generate (including its result cache) and the
+    responses come back in the same order. An invalid entry gets success=false
+    with the error instead of failing the whole batch.
     """
-    # Sample events
+    if not batch:
+        raise HTTPException(status_code=400, detail="batch must contain at least one request")
+    if len(batch) > _GENERATE_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"batch can contain at most {_GENERATE_BATCH_MAX} requests",
+        )
+    
+    # One threadpool hop for the whole batch; generation is CPU-bound, so
+    # spreading the entries over threads would only contend for the GIL.
+    responses = []
+    for request in batch:
+        ok, result = _generate_cached(request)
+        if ok:
+            response = TimetableResponse.model_construct(
+                success=True,
+                data=result,
+                message=_generated_message(result),
+            )
+        else:
+            response = TimetableResponse.model_construct(
+                success=False,
+                data={"error": result},
+                message="Generation failed",
+            )
+        responses.append(_response_body(response))
+    
+    return Response(_dumps(responses), media_type="application/json")
+
+
+# Sample topics for /sample; frozen so the cached sample can't be altered through them.
+_SAMPLE_TOPICS = (
+    MappingProxyType({
+        "id": "topic_1",
+        "subject": "Mathematics",
+        "topic": "Derivatives",
+        "difficulty_score": 0.7,
+        "confidence_score": 0.4,
+        "is_concept_heavy": True,
+        "estimated_hours": 3,
+    }),
+    MappingProxyType({
+        "id": "topic_2",
+        "subject": "Mathematics",
+        "topic": "Integrals",
+        "difficulty_score": 0.8,
+        "confidence_score": 0.3,
+        "is_concept_heavy": True,
+        "estimated_hours": 4,
+    }),
+    MappingProxyType({
+        "id": "topic_3",
+        "subject": "Physics",
+        "topic": "Kinematics",
+        "difficulty_score": 0.5,
+        "confidence_score": 0.6,
+        "is_concept_heavy": False,
+        "estimated_hours": 2,
+    }),
+)
+
+
+@lru_cache(maxsize=4)
+def _build_sample(today_ordinal: int) -> bytes:
+    """Build the encoded sample timetable for one day; it only depends on the date."""
+    today = date.fromordinal(today_ordinal)
+    
+    # Sample events, dated in the future
     sample_events = [
         {
             "id": "exam_1",
             "event_type": "exam",
             "subject": "Mathematics",
             "topic": "Calculus Final",
-            "target_date": date.today().isoformat(),
+            "target_date": (today + timedelta(days=7)).isoformat(),
             "priority_level": 9,
             "estimated_effort_hours": 12,
         },
@@ -200,49 +407,12 @@ async def get_sample_timetable() -> TimetableResponse:
             "event_type": "assignment",
             "subject": "Physics",
             "topic": "Lab Report",
-            "target_date": date.today().isoformat(),
+            "target_date": (today + timedelta(days=10)).isoformat(),
             "priority_level": 7,
             "estimated_effort_hours": 4,
         },
     ]
     
-    # Adjust dates to be in the future
-    from datetime import timedelta
-    for i, event in enumerate(sample_events):
-        future_date = date.today() + timedelta(days=7 + i * 3)
-        event["target_date"] = future_date.isoformat()
-    
-    # Sample topics
-    sample_topics = [
-        {
-            "id": "topic_1",
-            "subject": "Mathematics",
-            "topic": "Derivatives",
-            "difficulty_score": 0.7,
-            "confidence_score": 0.4,
-            "is_concept_heavy": True,
-            "estimated_hours": 3,
-        },
-        {
-            "id": "topic_2",
-            "subject": "Mathematics",
-            "topic": "Integrals",
-            "difficulty_score": 0.8,
-            "confidence_score": 0.3,
-            "is_concept_heavy": True,
-            "estimated_hours": 4,
-        },
-        {
-            "id": "topic_3",
-            "subject": "Physics",
-            "topic": "Kinematics",
-            "difficulty_score": 0.5,
-            "confidence_score": 0.6,
-            "is_concept_heavy": False,
-            "estimated_hours": 2,
-        },
-    ]
-    
     # Generate timetable
     scheduler = TimetableScheduler(
         events=sample_events,
@@ -254,20 +424,30 @@ async def get_sample_timetable() -> TimetableResponse:
             "session_length_minutes": 45,
             "max_sessions_per_day": 6,
         },
-        topics=sample_topics,
+        topics=list(_SAMPLE_TOPICS),
+        current_date=today,
     )
     
-    result = scheduler.generate()
-    
-    return TimetableResponse(
+    return _encode(TimetableResponse.model_construct(
         success=True,
-        data=result,
+        data=scheduler.generate(),
         message="Sample timetable generated",
-    )
+    ))
 
 
-@router.post("/validate", response_model=TimetableResponse)
-async def validate_inputs(request: GenerateTimetableRequest) -> TimetableResponse:
+@router.get("/sample", response_model=None, responses=_DOCUMENTED_RESPONSE)
+def get_sample_timetable() -> Response:
+    """
+    Generate a sample timetable for demonstration.
+    
+    Uses predefined sample data to show the system's capabilities. The result
+    is deterministic for a given day, so it is built once per day and reused.
+    """
+    return Response(_build_sample(date.today().toordinal()), media_type="application/json")
+
+
+@router.post("/validate", response_model=None, responses=_DOCUMENTED_RESPONSE)
+def validate_inputs(request: GenerateTimetableRequest) -> Response:
     """
     Validate timetable inputs without generating a schedule.
     
@@ -275,33 +455,26 @@ async def validate_inputs(request: GenerateTimetableRequest) -> TimetableRespons
     """
     try:
         # Try to normalize inputs (will raise if invalid)
-        from .scheduler import InputNormalizer
-        
-        normalizer = InputNormalizer()
-        
-        events = normalizer.normalize_events([e.model_dump() for e in request.events])
-        availability = normalizer.normalize_availability(request.availability.model_dump())
-        preferences = normalizer.normalize_preferences(request.preferences.model_dump())
-        topics = normalizer.normalize_topics([t.model_dump() for t in request.topics])
+        inputs = InputNormalizer.normalize_all(_scheduler_inputs(request))
         
-        return TimetableResponse(
+        return _json_response(TimetableResponse.model_construct(
             success=True,
             data={
-                "events_count": len(events),
-                "topics_count": len(topics),
-                "weekday_hours": availability.weekday_hours,
-                "weekend_hours": availability.weekend_hours,
-                "session_length": preferences.session_length_minutes,
+                "events_count": len(inputs.events),
+                "topics_count": len(inputs.topics),
+                "weekday_hours": inputs.availability.weekday_hours,
+                "weekend_hours": inputs.availability.weekend_hours,
+                "session_length": inputs.preferences.session_length_minutes,
             },
             message="All inputs are valid",
-        )
+        ))
         
     except ValueError as e:
-        return TimetableResponse(
+        return _json_response(TimetableResponse.model_construct(
             success=False,
             data={"error": str(e)},
             message="Validation failed",
-        )
+        ))
 
 
 # Export the router
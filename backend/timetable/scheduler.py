@@ -5,9 +5,13 @@ Deterministic, constraint-based scheduling algorithm.
 Implements greedy allocation with conflict resolution.
 """
 
+from bisect import bisect_right
+from collections import defaultdict
 from datetime import date, time
 from dataclasses import dataclass, field
+from operator import attrgetter
 from typing import Optional
+import sys
 import uuid
 
 from .models import (
@@ -28,6 +32,10 @@ from .scoring import UrgencyScorer, ScoreBreakdown
 from .utils import DateTimeUtils, generate_task_id, clamp
 
 
+# 23:59 in minutes since midnight; scheduled times never run past it
+_LAST_MINUTE = 23 * 60 + 59
+
+
 @dataclass
 class DayCapacity:
     """
@@ -42,7 +50,8 @@ class DayCapacity:
     sessions_used: int = 0
     subjects_used: set[str] = field(default_factory=set)
     last_topic: Optional[str] = None
-    next_available_time: time = field(default_factory=lambda: time(9, 0))
+    # Minutes since midnight; converted to a time only for each TimeSlot
+    next_available_minutes: int = 9 * 60
     
     def can_fit_session(self, minutes: int, subject: str, topic: str, max_subjects: int) -> bool:
         """Check if a session can fit in this day's remaining capacity."""
@@ -72,6 +81,26 @@ class DayCapacity:
         self.last_topic = topic
 
 
+def _intern(value):
+    """
+    Intern a subject/topic name.
+    
+    The scheduler compares and hashes these names for every placement
+    (subjects_used, last_topic); interned copies of the same name compare by
+    identity instead of character by character.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
+class NormalizedInputs:
+    """All scheduler inputs after normalization."""
+    events: list[FixedEvent]
+    availability: DailyAvailability
+    preferences: StudyPreferences
+    topics: list[LearningTopic]
+
+
 class InputNormalizer:
     """
     Normalizes raw input data into internal model objects.
@@ -79,6 +108,25 @@ class InputNormalizer:
     Handles various input formats and validates constraints.
     """
     
+    @classmethod
+    def normalize_all(cls, raw: dict) -> NormalizedInputs:
+        """
+        Normalize a full set of raw inputs in one call.
+        
+        Args:
+            raw: Dictionary with optional "events", "availability",
+                "preferences" and "topics" entries
+            
+        Returns:
+            NormalizedInputs bundle
+        """
+        return NormalizedInputs(
+            events=cls.normalize_events(raw.get("events", [])),
+            availability=cls.normalize_availability(raw.get("availability", {})),
+            preferences=cls.normalize_preferences(raw.get("preferences", {})),
+            topics=cls.normalize_topics(raw.get("topics", [])),
+        )
+    
     @staticmethod
     def normalize_events(events_data: list[dict]) -> list[FixedEvent]:
         """
@@ -107,8 +155,8 @@ class InputNormalizer:
             event = FixedEvent(
                 id=data.get("id", str(uuid.uuid4())),
                 event_type=event_type,
-                subject=data.get("subject", "Unknown"),
-                topic=data.get("topic"),
+                subject=_intern(data.get("subject", "Unknown")),
+                topic=_intern(data.get("topic")),
                 target_date=target_date,
                 priority_level=int(clamp(data.get("priority_level", data.get("priority", 5)), 1, 10)),
                 estimated_effort_hours=float(data.get("estimated_effort_hours", data.get("effort_hours", 2.0))),
@@ -129,10 +177,10 @@ class InputNormalizer:
         Returns:
             DailyAvailability object
         """
-        excluded_dates = []
+        excluded_dates = set()
         for d in availability_data.get("excluded_dates", []):
             try:
-                excluded_dates.append(DateTimeUtils.parse_date(d))
+                excluded_dates.add(DateTimeUtils.parse_date(d))
             except ValueError:
                 continue
         
@@ -147,7 +195,7 @@ class InputNormalizer:
                 availability_data.get("end_time"),
                 default=time(21, 0)
             ),
-            excluded_dates=tuple(excluded_dates),
+            excluded_dates=frozenset(excluded_dates),
         )
     
     @staticmethod
@@ -189,8 +237,8 @@ class InputNormalizer:
         for i, data in enumerate(topics_data):
             topic = LearningTopic(
                 id=data.get("id", f"topic_{i}"),
-                subject=data.get("subject", "Unknown"),
-                topic=data.get("topic", data.get("name", f"Topic {i}")),
+                subject=_intern(data.get("subject", "Unknown")),
+                topic=_intern(data.get("topic", data.get("name", f"Topic {i}"))),
                 difficulty_score=float(clamp(data.get("difficulty_score", data.get("difficulty", 0.5)), 0.0, 1.0)),
                 confidence_score=float(clamp(data.get("confidence_score", data.get("confidence", 0.5)), 0.0, 1.0)),
                 prerequisites=tuple(data.get("prerequisites", [])),
@@ -320,6 +368,9 @@ class TaskDecomposer:
         minutes_per_session = adjusted_minutes // num_sessions
         remainder = adjusted_minutes % num_sessions
         
+        # Every session of the topic shares the same priority
+        priority = self._calculate_topic_priority(topic)
+        
         for i in range(num_sessions):
             session_minutes = minutes_per_session + (1 if i < remainder else 0)
             session_minutes = min(max(session_minutes, 15), self.session_length)  # 15 min minimum
@@ -330,7 +381,7 @@ class TaskDecomposer:
                 topic=topic.topic,
                 deadline=deadline,
                 required_minutes=session_minutes,
-                priority=self._calculate_topic_priority(topic),
+                priority=priority,
                 difficulty_score=topic.difficulty_score,
                 confidence_score=topic.confidence_score,
                 task_type=TaskType.INITIAL_LEARNING,
@@ -410,7 +461,7 @@ class CapacityPlanner:
         self,
         start_date: date,
         end_date: date
-    ) -> dict[str, DayCapacity]:
+    ) -> dict[int, DayCapacity]:
         """
         Build a capacity map for each day in the planning horizon.
         
@@ -419,36 +470,48 @@ class CapacityPlanner:
             end_date: Last day to plan
             
         Returns:
-            Dictionary mapping date string to DayCapacity
+            Dictionary mapping date ordinal (date.toordinal()) to DayCapacity,
+            in date order
         """
         capacity_map = {}
-        
-        for current_date in DateTimeUtils.date_range(start_date, end_date):
-            # Get raw available hours
-            raw_hours = self.availability.get_hours_for_date(current_date)
-            
-            # Convert to minutes and apply buffer
-            raw_minutes = DateTimeUtils.hours_to_minutes(raw_hours)
-            buffer = int(raw_minutes * self.preferences.buffer_percentage)
-            available_minutes = raw_minutes - buffer
+        hours = self.availability.hours_array(start_date, end_date)
+        buffer_percentage = self.preferences.buffer_percentage
+        max_sessions = self.preferences.max_sessions_per_day
+        start_minutes = self.availability.start_time.hour * 60 + self.availability.start_time.minute
+        
+        # Days only take a few distinct hour values (weekday, weekend,
+        # excluded), so convert each one to (raw, available) minutes once
+        minutes_for_hours: dict[float, tuple[int, int]] = {}
+        
+        # Walk the horizon as date ordinals (also the map's keys)
+        ordinals = range(start_date.toordinal(), end_date.toordinal() + 1)
+        for ordinal, raw_hours in zip(ordinals, hours):
+            current_date = date.fromordinal(ordinal)
+            minutes = minutes_for_hours.get(raw_hours)
+            if minutes is None:
+                # Convert to minutes and apply buffer
+                raw_minutes = DateTimeUtils.hours_to_minutes(raw_hours)
+                buffer = int(raw_minutes * buffer_percentage)
+                minutes = minutes_for_hours[raw_hours] = (raw_minutes, raw_minutes - buffer)
+            raw_minutes, available_minutes = minutes
             
             capacity = DayCapacity(
                 date=current_date,
                 total_minutes=raw_minutes,
                 available_minutes=available_minutes,
-                max_sessions=self.preferences.max_sessions_per_day,
-                next_available_time=self.availability.start_time,
+                max_sessions=max_sessions,
+                next_available_minutes=start_minutes,
             )
             
-            capacity_map[current_date.isoformat()] = capacity
+            capacity_map[ordinal] = capacity
         
         return capacity_map
     
-    def get_total_capacity(self, capacity_map: dict[str, DayCapacity]) -> int:
+    def get_total_capacity(self, capacity_map: dict[int, DayCapacity]) -> int:
         """Get total available minutes across all days."""
         return sum(cap.available_minutes for cap in capacity_map.values())
     
-    def get_remaining_capacity(self, capacity_map: dict[str, DayCapacity]) -> int:
+    def get_remaining_capacity(self, capacity_map: dict[int, DayCapacity]) -> int:
         """Get remaining available minutes across all days."""
         return sum(cap.available_minutes for cap in capacity_map.values())
 
@@ -493,10 +556,16 @@ class TimetableScheduler:
         
         # Normalize inputs
         self.normalizer = InputNormalizer()
-        self.events = self.normalizer.normalize_events(events)
-        self.availability = self.normalizer.normalize_availability(availability)
-        self.preferences = self.normalizer.normalize_preferences(preferences)
-        self.topics = self.normalizer.normalize_topics(topics)
+        inputs = self.normalizer.normalize_all({
+            "events": events,
+            "availability": availability,
+            "preferences": preferences,
+            "topics": topics,
+        })
+        self.events = inputs.events
+        self.availability = inputs.availability
+        self.preferences = inputs.preferences
+        self.topics = inputs.topics
         
         # Initialize components
         self.scorer = UrgencyScorer()
@@ -506,7 +575,31 @@ class TimetableScheduler:
         # State
         self.tasks: list[StudyTask] = []
         self.warnings: list[CapacityWarning] = []
-        self.schedule: dict[str, DaySchedule] = {}
+        # Keyed by date ordinal; ISO date keys are only built for the output
+        self.schedule: dict[int, DaySchedule] = {}
+        
+        # Allocation index (see _schedule_tasks): days that may still take a
+        # session, in date order, with their ordinals for bisecting.
+        self._open_days: list[DayCapacity] = []
+        self._open_ords: list[int] = []
+        self._min_task_minutes = 0
+    
+    @classmethod
+    def generate_safe(cls, **inputs) -> tuple[bool, dict | str]:
+        """
+        Build a scheduler and generate, reporting invalid input instead of raising.
+        
+        Args:
+            **inputs: TimetableScheduler constructor arguments
+            
+        Returns:
+            (True, timetable dictionary) on success, or (False, error message)
+            when the inputs are invalid. Other errors still propagate.
+        """
+        try:
+            return True, cls(**inputs).generate()
+        except ValueError as e:
+            return False, str(e)
     
     def generate(self) -> dict:
         """
@@ -540,7 +633,7 @@ class TimetableScheduler:
         
         # 8. Build output
         output = TimetableOutput(
-            schedule=self.schedule,
+            schedule={day.date.isoformat(): day for day in self.schedule.values()},
             tasks=self.tasks,
             warnings=self.warnings,
             metadata={
@@ -590,12 +683,12 @@ class TimetableScheduler:
     
     def _initialize_schedule(self, start_date: date, end_date: date) -> None:
         """Initialize empty day schedules."""
-        for current_date in DateTimeUtils.date_range(start_date, end_date):
-            self.schedule[current_date.isoformat()] = DaySchedule(date=current_date)
+        for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1):
+            self.schedule[ordinal] = DaySchedule(date=date.fromordinal(ordinal))
     
     def _schedule_tasks(
         self,
-        capacity_map: dict[str, DayCapacity],
+        capacity_map: dict[int, DayCapacity],
         end_date: date
     ) -> None:
         """
@@ -609,67 +702,92 @@ class TimetableScheduler:
         # Calculate planning horizon for scoring
         horizon_days = DateTimeUtils.days_between(self.current_date, end_date)
         
-        # Score and rank tasks
-        ranked_tasks = self.scorer.rank_tasks(
+        # Score and rank tasks: most urgent first, earlier deadline on ties
+        # (the same order as UrgencyScorer.rank_tasks, without the breakdowns).
+        # Two stable sorts with C-level keys give that order without building
+        # a key tuple per task: by deadline, then by score descending.
+        pending_tasks.sort(key=attrgetter("deadline"))
+        scores = self.scorer.score_tasks(
             pending_tasks, self.current_date, horizon_days
         )
+        order = sorted(range(len(pending_tasks)), key=scores.__getitem__, reverse=True)
+        
+        # Index the days that can still take a session. capacity_map is built
+        # in date order. A day that runs out of sessions, or of minutes for even
+        # the shortest pending task, is dropped the first time a scan meets it,
+        # so later tasks stop rescanning it.
+        self._open_days = list(capacity_map.values())
+        self._open_ords = list(capacity_map)
+        self._min_task_minutes = min((t.required_minutes for t in pending_tasks), default=0)
         
         # Allocate tasks
-        for task, score, breakdown in ranked_tasks:
-            self._allocate_task(task, capacity_map)
+        max_subjects = self.preferences.max_subjects_per_day
+        for i in order:
+            self._allocate_task(pending_tasks[i], capacity_map, max_subjects)
     
     def _allocate_task(
         self,
         task: StudyTask,
-        capacity_map: dict[str, DayCapacity]
+        capacity_map: dict[int, DayCapacity],
+        max_subjects: int
     ) -> bool:
         """
         Allocate a single task to a time slot.
         
-        Uses greedy allocation with constraint checking.
+        Uses greedy allocation with constraint checking. max_subjects is
+        preferences.max_subjects_per_day, looked up once by the caller.
         
         Returns:
             True if task was scheduled, False otherwise
         """
-        # Get valid dates (current date to deadline)
-        valid_dates = list(DateTimeUtils.date_range(self.current_date, task.deadline))
-        
-        for target_date in valid_dates:
-            date_key = target_date.isoformat()
+        # Walk the open days from today up to the deadline, earliest first
+        open_days = self._open_days
+        open_ords = self._open_ords
+        min_minutes = self._min_task_minutes
+        minutes, subject, topic = task.required_minutes, task.subject, task.topic
+        end = bisect_right(open_ords, task.deadline.toordinal())
+        i = 0
+        while i < end:
+            capacity = open_days[i]
             
-            if date_key not in capacity_map:
+            # Full for every pending task: can_fit_session would reject it
+            # for this and every later task, so drop it from the index
+            if (capacity.sessions_used >= capacity.max_sessions
+                    or capacity.available_minutes < min_minutes):
+                del open_days[i]
+                del open_ords[i]
+                end -= 1
                 continue
             
-            capacity = capacity_map[date_key]
-            
-            # Check if task fits
-            if capacity.can_fit_session(
-                task.required_minutes,
-                task.subject,
-                task.topic,
-                self.preferences.max_subjects_per_day
-            ):
+            # Check if task fits: DayCapacity.can_fit_session inlined for this
+            # hot loop, minus the session limit the check above just passed
+            used = capacity.subjects_used
+            if (capacity.available_minutes >= minutes
+                    and (subject in used or len(used) < max_subjects)
+                    and (capacity.last_topic != topic or capacity.sessions_used == 0)):
                 # Allocate
-                self._add_task_to_schedule(task, capacity, target_date)
+                self._add_task_to_schedule(task, capacity, capacity.date)
                 return True
+            
+            i += 1
         
         # Could not schedule - try pushing past deadline if low priority
         if task.priority <= 5:
             # Try a few days past deadline
+            deadline_ord = task.deadline.toordinal()
             for offset in range(1, 4):
-                fallback_date = DateTimeUtils.add_days(task.deadline, offset)
-                date_key = fallback_date.isoformat()
+                capacity = capacity_map.get(deadline_ord + offset)
                 
-                if date_key not in capacity_map:
+                if capacity is None:
                     continue
                 
-                capacity = capacity_map[date_key]
+                fallback_date = capacity.date
                 
                 if capacity.can_fit_session(
                     task.required_minutes,
                     task.subject,
                     task.topic,
-                    self.preferences.max_subjects_per_day
+                    max_subjects
                 ):
                     # Allocate with warning
                     self._add_task_to_schedule(task, capacity, fallback_date)
@@ -691,17 +809,17 @@ class TimetableScheduler:
         target_date: date
     ) -> None:
         """Add a task to the schedule and update capacity."""
-        date_key = target_date.isoformat()
-        day_schedule = self.schedule[date_key]
+        day_schedule = self.schedule[target_date.toordinal()]
         
-        # Calculate time slot
-        start_time = capacity.next_available_time
-        end_time = DateTimeUtils.add_minutes_to_time(start_time, task.required_minutes)
+        # Calculate time slot in minutes since midnight, capped at 23:59 like
+        # DateTimeUtils.add_minutes_to_time
+        start_minutes = capacity.next_available_minutes
+        end_minutes = min(start_minutes + task.required_minutes, _LAST_MINUTE)
         
         # Create time slot
         slot = TimeSlot(
-            start_time=start_time,
-            end_time=end_time,
+            start_time=time(start_minutes // 60, start_minutes % 60),
+            end_time=time(end_minutes // 60, end_minutes % 60),
             subject=task.subject,
             topic=task.topic,
             task_id=task.task_id,
@@ -718,9 +836,9 @@ class TimetableScheduler:
         capacity.allocate(task.required_minutes, task.subject, task.topic)
         
         # Update next available time (add break)
-        total_minutes = task.required_minutes + self.preferences.break_length_minutes
-        capacity.next_available_time = DateTimeUtils.add_minutes_to_time(
-            start_time, total_minutes
+        capacity.next_available_minutes = min(
+            start_minutes + task.required_minutes + self.preferences.break_length_minutes,
+            _LAST_MINUTE,
         )
         
         # Update capacity used percentage
@@ -730,7 +848,7 @@ class TimetableScheduler:
     
     def _add_spaced_repetition(
         self,
-        capacity_map: dict[str, DayCapacity],
+        capacity_map: dict[int, DayCapacity],
         end_date: date
     ) -> None:
         """
@@ -738,78 +856,75 @@ class TimetableScheduler:
         
         Follows intervals: +1 day, +3 days, +7 days after initial learning.
         """
-        # Find scheduled initial learning tasks for concept-heavy topics
-        concept_topic_ids = {t.id for t in self.topics if t.is_concept_heavy}
-        
-        initial_tasks = [
-            t for t in self.tasks
-            if t.status == TaskStatus.SCHEDULED
-            and t.task_type == TaskType.INITIAL_LEARNING
-            and t.source_topic_id in concept_topic_ids
-            and t.scheduled_date is not None
-        ]
+        concept_topic_ids = frozenset(t.id for t in self.topics if t.is_concept_heavy)
+        if not concept_topic_ids:
+            return
         
-        # Group by topic to avoid duplicate revisions
+        # Find the earliest scheduled initial learning task of each
+        # concept-heavy topic (one per topic avoids duplicate revisions)
         topic_tasks: dict[str, StudyTask] = {}
-        for task in initial_tasks:
-            if task.source_topic_id:
-                # Keep the earliest scheduled task for each topic
-                existing = topic_tasks.get(task.source_topic_id)
-                if not existing or (task.scheduled_date and existing.scheduled_date and 
-                                   task.scheduled_date < existing.scheduled_date):
-                    topic_tasks[task.source_topic_id] = task
-        
-        # Create revision tasks
+        for task in self.tasks:
+            topic_id = task.source_topic_id
+            if (
+                topic_id
+                and topic_id in concept_topic_ids
+                and task.status == TaskStatus.SCHEDULED
+                and task.task_type == TaskType.INITIAL_LEARNING
+                and task.scheduled_date is not None
+            ):
+                existing = topic_tasks.get(topic_id)
+                if existing is None or task.scheduled_date < existing.scheduled_date:
+                    topic_tasks[topic_id] = task
+        
+        # Create revision tasks at each interval that falls within the
+        # horizon (DateTimeUtils.get_spaced_repetition_dates, on ordinals)
+        max_subjects = self.preferences.max_subjects_per_day
+        end_ord = end_date.toordinal()
         for source_task in topic_tasks.values():
-            if source_task.scheduled_date is None:
-                continue
-                
-            revision_dates = DateTimeUtils.get_spaced_repetition_dates(
-                source_task.scheduled_date,
-                end_date,
-                self.REVISION_INTERVALS
-            )
+            start_ord = source_task.scheduled_date.toordinal()
+            revision_number = 0
             
-            for i, rev_date in enumerate(revision_dates, 1):
+            for interval in self.REVISION_INTERVALS:
+                rev_ord = start_ord + interval
+                if rev_ord > end_ord:
+                    continue
+                revision_number += 1
+                rev_date = date.fromordinal(rev_ord)
+                
                 revision_task = self.decomposer.create_revision_task(
-                    source_task, rev_date, i
+                    source_task, rev_date, revision_number
                 )
                 
                 # Try to schedule
-                date_key = rev_date.isoformat()
-                if date_key in capacity_map:
-                    capacity = capacity_map[date_key]
+                capacity = capacity_map.get(rev_ord)
+                if capacity is not None:
                     
                     if capacity.can_fit_session(
                         revision_task.required_minutes,
                         revision_task.subject,
                         revision_task.topic,
-                        self.preferences.max_subjects_per_day
+                        max_subjects
                     ):
                         self.tasks.append(revision_task)
                         self._add_task_to_schedule(revision_task, capacity, rev_date)
     
     def _check_completeness(self) -> None:
         """Check for unscheduled tasks and generate warnings."""
-        unscheduled = [t for t in self.tasks if t.status == TaskStatus.PENDING]
-        
-        if unscheduled:
-            # Group by deadline
-            by_deadline: dict[date, list[StudyTask]] = {}
-            for task in unscheduled:
-                if task.deadline not in by_deadline:
-                    by_deadline[task.deadline] = []
+        # Group unscheduled tasks by deadline
+        by_deadline: defaultdict[date, list[StudyTask]] = defaultdict(list)
+        for task in self.tasks:
+            if task.status == TaskStatus.PENDING:
                 by_deadline[task.deadline].append(task)
+        
+        for deadline, tasks in by_deadline.items():
+            severity = "critical" if any(t.priority >= 8 for t in tasks) else "warning"
             
-            for deadline, tasks in by_deadline.items():
-                severity = "critical" if any(t.priority >= 8 for t in tasks) else "warning"
-                
-                self.warnings.append(CapacityWarning(
-                    date=deadline,
-                    message=f"Could not schedule {len(tasks)} task(s) before deadline",
-                    affected_tasks=[t.task_id for t in tasks],
-                    severity=severity,
-                ))
+            self.warnings.append(CapacityWarning(
+                date=deadline,
+                message=f"Could not schedule {len(tasks)} task(s) before deadline",
+                affected_tasks=[t.task_id for t in tasks],
+                severity=severity,
+            ))
 
 
 # Convenience functions for adaptivity support
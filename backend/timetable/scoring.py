@@ -330,6 +330,57 @@ class UrgencyScorer:
         
         return scored_tasks
     
+    def score_tasks(
+        self,
+        tasks: list[StudyTask],
+        current_date: date,
+        planning_horizon_days: int = 30
+    ) -> list[float]:
+        """
+        Calculate urgency scores for many tasks at once.
+        
+        Returns the same values as calculate_score(), in input order, but
+        computes the weighted sum inline instead of building a ScoreBreakdown
+        (and its explanation text) per task. Used on the scheduling hot path.
+        
+        Args:
+            tasks: Tasks to score
+            current_date: Current date for calculations
+            planning_horizon_days: Planning horizon for normalization
+            
+        Returns:
+            List of urgency scores between 0 and 1
+        """
+        weights = self.weights
+        priority_w = weights.priority_weight
+        difficulty_w = weights.difficulty_weight
+        deadline_w = weights.deadline_weight
+        confidence_w = weights.confidence_weight
+        type_w = weights.type_weight
+        type_bonuses = self.TYPE_BONUSES
+        
+        scores = []
+        for task in tasks:
+            # Mirrors _calculate_deadline_component
+            days_remaining = (task.deadline - current_date).days
+            if days_remaining <= 0:
+                deadline_component = 1.0
+            elif days_remaining >= planning_horizon_days:
+                deadline_component = 0.1
+            else:
+                deadline_component = max(0.1, 1.0 - (days_remaining / planning_horizon_days) ** 0.5)
+            
+            total_score = (
+                max(1, min(10, task.priority)) / 10.0 * priority_w +
+                max(0.0, min(1.0, task.difficulty_score)) * difficulty_w +
+                deadline_component * deadline_w +
+                (1.0 - max(0.0, min(1.0, task.confidence_score))) * confidence_w +
+                type_bonuses.get(task.task_type, 0.0) * type_w
+            )
+            scores.append(max(0.0, min(1.0, total_score)))
+        
+        return scores
+    
     def filter_schedulable_tasks(
         self,
         tasks: list[StudyTask],
@@ -170,6 +170,21 @@ class TestDailyAvailability:
         )
         hours = availability.get_hours_for_date(excluded)
         assert hours == 0.0
+        assert availability.excluded_dates == frozenset({excluded})
+    
+    def test_hours_array_matches_per_date_lookup(self):
+        """Test hours_array agrees with get_hours_for_date across weeks."""
+        start = date(2024, 1, 10)
+        availability = DailyAvailability(
+            weekday_hours=4.0,
+            weekend_hours=6.0,
+            excluded_dates=(date(2024, 1, 13), date(2024, 1, 22)),
+        )
+        end = start + timedelta(days=20)
+        
+        expected = [availability.get_hours_for_date(start + timedelta(days=i)) for i in range(21)]
+        assert availability.hours_array(start, end) == expected
+        assert availability.hours_array(end, start) == []
 
 
 class TestStudyPreferences:
@@ -258,6 +273,19 @@ class TestDaySchedule:
         ))
         
         assert day.get_session_count() == 1  # Only counts non-breaks
+    
+    def test_slot_duration_is_precomputed(self):
+        """Test TimeSlot derives its duration from start/end time."""
+        slot = TimeSlot(
+            start_time=time(9, 50),
+            end_time=time(11, 5),
+            subject="Math",
+            topic="Calculus",
+            task_id="task_001",
+        )
+        
+        assert slot.duration_minutes == 75
+        assert "duration_minutes" not in slot.to_dict()
 
 
 # ============================================================================
@@ -479,6 +507,36 @@ class TestUrgencyScorer:
         assert ranked[0][0].task_id == "high"
         assert ranked[1][0].task_id == "low"
     
+    def test_score_tasks_matches_calculate_score(self):
+        """Test batch scoring returns exactly the per-task scores."""
+        scorer = UrgencyScorer()
+        today = date(2024, 1, 15)
+        
+        tasks = [
+            StudyTask(
+                task_id=f"t{i}",
+                subject="Test",
+                topic="Test",
+                deadline=today + timedelta(days=days),
+                required_minutes=45,
+                priority=priority,
+                difficulty_score=difficulty,
+                confidence_score=confidence,
+                task_type=task_type,
+            )
+            for i, (days, priority, difficulty, confidence, task_type) in enumerate([
+                (-2, 10, 1.0, 0.0, TaskType.EXAM_PREP),
+                (0, 1, 0.0, 1.0, TaskType.PRACTICE),
+                (3, 7, 0.7, 0.3, TaskType.REVISION),
+                (17, 5, 0.5, 0.5, TaskType.INITIAL_LEARNING),
+                (45, 3, 0.2, 0.9, TaskType.INITIAL_LEARNING),
+            ])
+        ]
+        
+        assert scorer.score_tasks(tasks, today, 30) == [
+            scorer.calculate_score(t, today, 30) for t in tasks
+        ]
+    
     def test_score_breakdown(self, sample_task):
         """Test score breakdown contains all components."""
         scorer = UrgencyScorer()
@@ -567,6 +625,32 @@ class TestInputNormalizer:
         assert len(topics) == 1
         assert topics[0].subject == "Physics"
         assert topics[0].difficulty_score == 0.6
+    
+    def test_subject_names_are_interned(self):
+        """Equal subject names normalize to the same string object."""
+        raw = [
+            {"subject": "".join(["Mathe", "matics"]), "topic": "Limits"},
+            {"subject": "".join(["Math", "ematics"]), "topic": "Series"},
+        ]
+        
+        topics = InputNormalizer.normalize_topics(raw)
+        
+        assert raw[0]["subject"] is not raw[1]["subject"]
+        assert topics[0].subject is topics[1].subject
+    
+    def test_normalize_all(self):
+        """Test normalizing every input in one call."""
+        inputs = InputNormalizer.normalize_all({
+            "events": [{"subject": "Math", "target_date": "2024-02-15"}],
+            "preferences": {"session_length_minutes": 50},
+            "topics": [{"subject": "Physics", "topic": "Kinematics"}],
+        })
+        
+        assert len(inputs.events) == 1
+        assert inputs.events[0].target_date == date(2024, 2, 15)
+        assert inputs.availability.weekday_hours == 4.0
+        assert inputs.preferences.session_length_minutes == 50
+        assert [t.topic for t in inputs.topics] == ["Kinematics"]
 
 
 class TestTaskDecomposer:
@@ -619,11 +703,11 @@ class TestCapacityPlanner:
         assert len(capacity_map) == 7
         
         # Check weekday capacity
-        monday_cap = capacity_map["2024-01-15"]
+        monday_cap = capacity_map[date(2024, 1, 15).toordinal()]
         assert monday_cap.total_minutes == 4 * 60  # 4 hours
         
         # Check weekend capacity
-        saturday_cap = capacity_map["2024-01-20"]
+        saturday_cap = capacity_map[date(2024, 1, 20).toordinal()]
         assert saturday_cap.total_minutes == 6 * 60  # 6 hours
 
 
@@ -688,6 +772,23 @@ class TestDayCapacity:
 class TestTimetableScheduler:
     """Tests for TimetableScheduler."""
     
+    def test_generate_safe(self):
+        """Test that invalid input is reported instead of raised."""
+        ok, result = TimetableScheduler.generate_safe(
+            events=[], availability={}, preferences={}, topics=[],
+            current_date="2024-02-01",
+        )
+        assert ok is True
+        assert "schedule" in result
+        
+        ok, error = TimetableScheduler.generate_safe(
+            events=[{"subject": "Math", "target_date": "not-a-date"}],
+            availability={}, preferences={}, topics=[],
+            current_date="2024-02-01",
+        )
+        assert ok is False
+        assert isinstance(error, str) and error
+    
     def test_generate_simple_timetable(self):
         """Test generating a simple timetable."""
         events = [
@@ -728,6 +829,47 @@ class TestTimetableScheduler:
         assert "metadata" in result
         assert result["metadata"]["total_events"] == 1
     
+    def test_full_days_are_skipped(self):
+        """Test that once a day is full, later tasks land on the next free day."""
+        scheduler = TimetableScheduler(
+            events=[],
+            availability={"weekday_hours": 8, "weekend_hours": 8},
+            preferences={"session_length_minutes": 60, "max_sessions_per_day": 1},
+            topics=[
+                {"id": f"t{i}", "subject": "Math", "topic": f"Topic {i}",
+                 "difficulty_score": 0.5, "confidence_score": 0.5, "estimated_hours": 1}
+                for i in range(4)
+            ],
+            current_date="2024-01-15",
+        )
+        
+        result = scheduler.generate()
+        
+        dates = sorted(t["scheduled_date"] for t in result["tasks"] if t["scheduled_date"])
+        assert dates[:4] == ["2024-01-15", "2024-01-16", "2024-01-17", "2024-01-18"]
+        assert all(len(day["slots"]) <= 1 for day in result["schedule"].values())
+        # Full days have been dropped from the allocation index
+        assert date(2024, 1, 15) not in [c.date for c in scheduler._open_days]
+    
+    def test_late_sessions_capped_at_midnight(self):
+        """Test that session times never run past 23:59."""
+        scheduler = TimetableScheduler(
+            events=[],
+            availability={"weekday_hours": 8, "weekend_hours": 8, "start_time": "22:10"},
+            preferences={"max_sessions_per_day": 8, "break_length_minutes": 20},
+            topics=[
+                {"id": f"t{i}", "subject": f"S{i % 2}", "topic": f"Topic {i}", "estimated_hours": 3}
+                for i in range(4)
+            ],
+            current_date="2024-01-15",
+        )
+        
+        slots = scheduler.generate()["schedule"]["2024-01-15"]["slots"]
+        
+        assert slots[0]["start_time"] == "22:10:00"
+        assert slots[1]["start_time"] == "23:11:00"
+        assert slots[-1]["start_time"] == slots[-1]["end_time"] == "23:59:00"
+    
     def test_generate_with_topics(self):
         """Test generating timetable with topics."""
         events = []